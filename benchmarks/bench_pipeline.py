@@ -0,0 +1,271 @@
+"""Benchmarks for the GeoLocator update pipeline.
+
+Runs fully offline: provider requests go to benchmarks.stub_server, which
+serves the synthetic responses in benchmarks/fixtures (hand-written in each
+provider's format, not captured traffic), so the numbers measure the
+integration's own work plus the stub's configured latency, not real providers. Needs the packages from
+manifest.json plus homeassistant installed.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --iterations 200 --latency 0.02 --json results.json
+    python -m benchmarks.bench_pipeline --scenario pipeline
+
+Each scenario reports p50/p95 latency from a timing pass, then allocation peak
+and retained memory from a separate tracemalloc pass (tracing slows the code it
+measures, so the two are not mixed), and the process peak RSS afterwards.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import resource
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.geolocator.const import API_PROVIDER_META, TIMEZONE_MODE_IN_MEMORY, TIMEZONE_MODE_MMAP
+from custom_components.geolocator.coordinator import GeoLocatorCoordinator
+from custom_components.geolocator.failover import ProviderChain
+from custom_components.geolocator.gazetteer import Gazetteer
+from custom_components.geolocator.models import LocationSnapshot
+from custom_components.geolocator.movement import MovementGate, TimezoneHysteresis
+from custom_components.geolocator.names import TimezoneNameTable, _compute_names
+from custom_components.geolocator.providers import async_create_api
+from custom_components.geolocator.sensor import SENSOR_KEYS, GeoLocatorSensor
+from custom_components.geolocator.timezone import TimezoneEngine
+
+from .stub_server import StubServer
+
+HOME = (30.2672, -97.7431)  # matches the fixtures
+ALLOCATION_ITERATIONS = 20
+COLD_ITERATIONS = 3
+PROVIDERS = ("google", "opencage", "geonames", "bigdatacloud", "osm", "nominatim", "photon", "offline")
+# A spread of zones so name resolution and full searches don't hit one polygon
+SAMPLE_POINTS = (
+    (30.2672, -97.7431), (39.7392, -104.9903), (33.4484, -112.0740), (47.6062, -122.3321),
+    (40.7128, -74.0060), (51.5074, -0.1278), (52.5200, 13.4050), (35.6762, 139.6503),
+    (-33.8688, 151.2093), (-23.5505, -46.6333), (19.4326, -99.1332), (28.6139, 77.2090),
+)
+SAMPLE_ZONES = (
+    "America/Chicago", "America/Denver", "America/Phoenix", "America/Los_Angeles", "America/New_York",
+    "Europe/London", "Europe/Berlin", "Asia/Tokyo", "Australia/Sydney", "America/Sao_Paulo",
+    "America/Mexico_City", "Asia/Kolkata",
+)
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _DetachedSensor(GeoLocatorSensor):
+    """A real sensor whose state writes go nowhere, so fan-out is measured without a state machine."""
+
+    def async_write_ha_state(self) -> None:
+        pass
+
+
+class Benchmark:
+    def __init__(self, hass: HomeAssistant, iterations: int, allocations: bool, server: StubServer):
+        self.hass = hass
+        self.iterations = iterations
+        self.allocations = allocations
+        self.results = []
+        self.entry = SimpleNamespace(entry_id="benchmark", options={}, data={})
+        self.server = server
+
+    async def measure(self, name: str, step, iterations: int | None = None):
+        """Time step(i) over the iterations, then trace its allocations."""
+        iterations = iterations or self.iterations
+        gc.collect()
+        timings = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            await step(i)
+            timings.append(time.perf_counter() - start)
+
+        result = {
+            "scenario": name,
+            "iterations": iterations,
+            "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+            "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+        }
+
+        if self.allocations:
+            gc.collect()
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for i in range(min(iterations, ALLOCATION_ITERATIONS)):
+                await step(iterations + i)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["alloc_peak_kib"] = round((peak - baseline) / 1024, 1)
+            result["retained_kib"] = round((current - baseline) / 1024, 1)
+
+        result["peak_rss_mib"] = round(_peak_rss_mib(), 1)
+        self.results.append(result)
+        print(_format_row(result), flush=True)
+
+    async def coordinator(self, provider: str, engine: TimezoneEngine, names: TimezoneNameTable):
+        chain = None
+        api = await async_create_api(
+            self.hass, provider, async_get_clientsession(self.hass), "benchmark", 10,
+            self.server.self_hosted_url(provider),
+        )
+        if api is not None:
+            chain = ProviderChain([api])
+        return GeoLocatorCoordinator(
+            self.hass, self.entry, provider, chain, engine, names,
+            Gazetteer(self.hass, self.hass.config.path("geolocator", "gazetteer.bin")),
+            MovementGate(0), TimezoneHysteresis(0, 0),
+        )
+
+    async def run_timezone(self):
+        for mode in (TIMEZONE_MODE_IN_MEMORY, TIMEZONE_MODE_MMAP):
+            async def _cold(i, mode=mode):
+                engine = TimezoneEngine(self.hass, mode)
+                await engine.async_timezone_at(*HOME)
+
+            await self.measure(f"timezone_cold[{mode}]", _cold, COLD_ITERATIONS)
+
+        engine = TimezoneEngine(self.hass, TIMEZONE_MODE_IN_MEMORY)
+        await engine.async_load()
+
+        async def _full_search(i):
+            await self.hass.async_add_executor_job(
+                engine.timezones_at, [SAMPLE_POINTS[i % len(SAMPLE_POINTS)]]
+            )
+
+        async def _fast_path(i):
+            # ~10 m steps around home, as a parked or slowly moving install sees
+            await engine.async_timezone_at(HOME[0] + (i % 100) * 1e-4, HOME[1], "benchmark")
+
+        await self.measure("timezone_warm[full_search]", _full_search)
+        await self.measure("timezone_warm[fast_path]", _fast_path)
+        return engine
+
+    async def run_names(self, names: TimezoneNameTable):
+        async def _babel(i):
+            await self.hass.async_add_executor_job(
+                _compute_names, [SAMPLE_ZONES[i % len(SAMPLE_ZONES)]], "en-US"
+            )
+
+        async def _table(i):
+            await names.async_get(SAMPLE_ZONES[i % len(SAMPLE_ZONES)], "en-US", "standard")
+
+        await names.async_prewarm(SAMPLE_ZONES, "en-US")
+        await self.measure("names[babel]", _babel)
+        await self.measure("names[table_warm]", _table)
+
+    async def run_pipeline(self, engine: TimezoneEngine, names: TimezoneNameTable):
+        for provider in PROVIDERS:
+            coordinator = await self.coordinator(provider, engine, names)
+
+            async def _update(i, coordinator=coordinator):
+                # A fresh point every time so coalescing doesn't answer from the previous run
+                self.hass.config.latitude = HOME[0] + i * 1e-5
+                self.hass.config.longitude = HOME[1]
+                await coordinator.async_update_location(force=True)
+
+            await self.measure(f"pipeline[{provider}]", _update)
+            coordinator.async_shutdown()
+
+    async def run_fanout(self, engine: TimezoneEngine, names: TimezoneNameTable):
+        for trackers in (1, 50):
+            coordinator = await self.coordinator("offline", engine, names)
+            for t in range(trackers):
+                for key, name in SENSOR_KEYS.items():
+                    entry = SimpleNamespace(entry_id=f"benchmark_{t}")
+                    sensor = _DetachedSensor(entry, coordinator, key, name)
+                    coordinator.async_add_entity(sensor)
+
+            snapshots = (
+                LocationSnapshot(city="Austin", state="Texas", country="United States",
+                                 timezone_id="America/Chicago", timezone_abbreviation="CDT"),
+                LocationSnapshot(city="Round Rock", state="Texas", country="United States",
+                                 timezone_id="America/Chicago", timezone_abbreviation="CDT"),
+            )
+
+            async def _publish(i, coordinator=coordinator):
+                coordinator.async_publish(snapshots[i % 2])
+
+            await self.measure(f"fanout[{trackers * len(SENSOR_KEYS)} sensors]", _publish)
+
+
+def _format_row(result: dict) -> str:
+    return (
+        f"{result['scenario']:<32} n={result['iterations']:<5} "
+        f"p50={result['p50_ms']:>9.3f} ms  p95={result['p95_ms']:>9.3f} ms  "
+        f"alloc_peak={result.get('alloc_peak_kib', '-'):>9} KiB  "
+        f"retained={result.get('retained_kib', '-'):>8} KiB  "
+        f"peak_rss={result['peak_rss_mib']:>7} MiB"
+    )
+
+
+async def _async_main(args) -> list:
+    # Rate limits would measure the token buckets, not the pipeline
+    for meta in API_PROVIDER_META.values():
+        meta.pop("rate_limit", None)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config.latitude, hass.config.longitude = HOME
+        hass.config.time_zone = "America/Chicago"
+        hass.config.language = "en"
+
+        server = StubServer(latency=args.latency, jitter=args.jitter)
+        await server.start()
+        server.point_providers_at()
+
+        bench = Benchmark(hass, args.iterations, not args.no_allocations, server)
+        names = TimezoneNameTable(hass)
+        await names.async_load()
+        try:
+            engine = None
+            if "timezone" in args.scenario or "pipeline" in args.scenario or "fanout" in args.scenario:
+                engine = await bench.run_timezone() if "timezone" in args.scenario else TimezoneEngine(hass)
+            if "names" in args.scenario:
+                await bench.run_names(names)
+            if "pipeline" in args.scenario:
+                await bench.run_pipeline(engine, names)
+            if "fanout" in args.scenario:
+                await bench.run_fanout(engine, names)
+        finally:
+            await server.stop()
+            await hass.async_stop(force=True)
+
+        print(f"stub server requests: {dict(server.requests)}")
+        return bench.results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the GeoLocator update pipeline offline.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server delay per response, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random stub delay, seconds")
+    parser.add_argument("--scenario", action="append", choices=("timezone", "names", "pipeline", "fanout"),
+                        help="run only these groups (repeatable); default all")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    args.scenario = args.scenario or ["timezone", "names", "pipeline", "fanout"]
+
+    results = asyncio.run(_async_main(args))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
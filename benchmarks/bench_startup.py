@@ -0,0 +1,99 @@
+"""Import cost of the GeoLocator integration at Home Assistant startup.
+
+Each run imports the integration in a fresh interpreter, after the Home
+Assistant modules it needs are already loaded (they are at boot anyway), so
+only the integration's own import cost is measured.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 20 --json startup.json
+
+"lazy" is the integration as it ships: provider modules, timezonefinder,
+numpy, Babel and openlocationcode load on first use. "eager" also imports all
+of them up front, the way the integration used to, for comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded at import time before provider modules and heavy dependencies were deferred
+DEFERRED_MODULES = (
+    "custom_components.geolocator.api.google",
+    "custom_components.geolocator.api.opencage",
+    "custom_components.geolocator.api.geonames",
+    "custom_components.geolocator.api.bigdatacloud",
+    "custom_components.geolocator.api.osm",
+    "custom_components.geolocator.api.photon",
+    "timezonefinder",
+    "numpy",
+    "babel.dates",
+    "openlocationcode.openlocationcode",
+)
+
+RUN = """
+import importlib, json, sys, time
+import aiohttp
+import homeassistant.core
+import homeassistant.helpers.aiohttp_client
+import homeassistant.helpers.config_validation
+import homeassistant.helpers.storage
+
+start = time.perf_counter()
+import custom_components.geolocator
+for name in {eager!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def _run(eager: bool) -> dict:
+    code = RUN.format(eager=DEFERRED_MODULES if eager else (), deferred=DEFERRED_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the integration's import cost.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for variant in ("lazy", "eager"):
+        runs = [_run(variant == "eager") for _ in range(args.runs)]
+        timings = [run["seconds"] * 1000 for run in runs]
+        result = {
+            "variant": variant,
+            "runs": args.runs,
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+            "deferred_modules_loaded": runs[-1]["loaded"],
+        }
+        results.append(result)
+        print(
+            f"{variant:<6} median={result['median_ms']:>8.1f} ms  min={result['min_ms']:>8.1f} ms  "
+            f"max={result['max_ms']:>8.1f} ms  deferred modules loaded: {len(result['deferred_modules_loaded'])}"
+        )
+
+    lazy, eager = results
+    print(f"saved at startup: {eager['median_ms'] - lazy['median_ms']:.1f} ms")
+    if lazy["deferred_modules_loaded"]:
+        print(f"still imported at startup: {', '.join(lazy['deferred_modules_loaded'])}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Batch timezone lookup against the per-point loop it replaces.
+
+Both run on the same loaded TimezoneEngine; every batch is also checked to give
+exactly the per-point answers.
+
+    python -m benchmarks.bench_timezone_batch
+    python -m benchmarks.bench_timezone_batch --sizes 1000 100000 --mode mmap --json batch.json
+
+"world" scatters points uniformly over the globe, so most land in shortcuts
+with a single zone or in the ocean. "trip" is a random walk of ~1 km steps
+from Austin, like a tracker's history being backfilled, so points crowd into a
+few shortcuts and the per-shortcut work is shared by many points.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import numpy as np
+from homeassistant.core import HomeAssistant
+
+from custom_components.geolocator.const import TIMEZONE_MODE_IN_MEMORY, TIMEZONE_MODE_MMAP
+from custom_components.geolocator.timezone import TimezoneEngine
+
+HOME = (30.2672, -97.7431)
+STEP_DEGREES = 0.01  # ~1 km
+
+
+def _world(rng, size):
+    return rng.uniform(-90, 90, size), rng.uniform(-180, 180, size)
+
+
+def _trip(rng, size):
+    steps = rng.normal(0, STEP_DEGREES, (2, size)).cumsum(axis=1)
+    return np.clip(HOME[0] + steps[0], -90, 90), (HOME[1] + steps[1] + 180) % 360 - 180
+
+
+DISTRIBUTIONS = {"world": _world, "trip": _trip}
+
+
+def _best_of(repeats, function, *args):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(engine: TimezoneEngine, sizes, repeats: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    results = []
+    # Reads the shortcut table once, outside the measurements
+    engine.timezone_ids_at([HOME[0]], [HOME[1]])
+    for distribution, generate in DISTRIBUTIONS.items():
+        for size in sizes:
+            lats, lons = generate(rng, size)
+            loop_seconds, expected = _best_of(
+                repeats, lambda: [engine._lookup(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+            )
+            batch_seconds, zones = _best_of(repeats, engine.timezone_ids_at, lats, lons)
+            result = {
+                "scenario": f"{distribution}[{size}]",
+                "loop_ms": round(loop_seconds * 1000, 2),
+                "batch_ms": round(batch_seconds * 1000, 2),
+                "speedup": round(loop_seconds / batch_seconds, 1),
+                "mismatches": sum(zone != want for zone, want in zip(zones.tolist(), expected)),
+            }
+            results.append(result)
+            print(
+                f"{result['scenario']:<14} loop={result['loop_ms']:>10.2f} ms  batch={result['batch_ms']:>9.2f} ms  "
+                f"speedup={result['speedup']:>6.1f}x  mismatches={result['mismatches']}",
+                flush=True,
+            )
+    return results
+
+
+async def _async_main(args) -> list:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            engine = TimezoneEngine(hass, args.mode)
+            await engine.async_load()
+            return await hass.async_add_executor_job(run, engine, args.sizes, args.repeats, args.seed)
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare batch and per-point timezone lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--mode", choices=(TIMEZONE_MODE_IN_MEMORY, TIMEZONE_MODE_MMAP), default=TIMEZONE_MODE_IN_MEMORY)
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per scenario; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(_async_main(args))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Local HTTP server serving canned provider responses.
+
+Used by the benchmarks and runnable on its own:
+
+    python -m benchmarks.stub_server --port 8765 --latency 0.05
+
+Every provider endpoint in custom_components/geolocator/api maps to one
+fixture in benchmarks/fixtures, served at /<fixture name>. The bundled
+fixtures are synthetic: hand-written in each provider's documented response
+format for one point in Austin, TX, not captured from real traffic.
+
+It also stands in for self-hosted servers at the paths they really use, so a
+Home Assistant instance configured with the Nominatim or Photon provider and
+a base URL of http://<host>:<port>/nominatim or /photon can be load tested
+without any real server. --fixtures serves a directory of your own captured
+responses instead of the bundled ones.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import random
+import socket
+from collections import Counter
+from dataclasses import replace
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# (api module, provider class, endpoint attribute) -> fixture served in its place
+ROUTES = {
+    ("google", "GoogleMapsAPI", "geocode_endpoint"): "google_geocode",
+    ("google", "GoogleMapsAPI", "timezone_endpoint"): "google_timezone",
+    ("opencage", "OpenCageAPI", "geocode_endpoint"): "opencage_geocode",
+    ("geonames", "GeoNamesAPI", "reverse_endpoint"): "geonames_address",
+    ("geonames", "GeoNamesAPI", "place_endpoint"): "geonames_place",
+    ("geonames", "GeoNamesAPI", "timezone_endpoint"): "geonames_timezone",
+    ("bigdatacloud", "BigDataCloudAPI", "geocode_endpoint"): "bigdatacloud_geocode",
+    ("osm", "OSMAPI", "geocode_endpoint"): "osm_reverse",
+}
+
+# (self-hosted provider, request path) -> fixture served under /<provider>/<path>
+SELF_HOSTED_ROUTES = {
+    ("nominatim", "reverse"): "osm_reverse",
+    ("photon", "reverse"): "photon_reverse",
+}
+
+
+class StubServer:
+    """Serve the fixtures with optional latency, jitter and injected failures."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, fixtures: Path = FIXTURES):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self._fixtures = {
+            path.stem: path.read_bytes() for path in sorted(fixtures.glob("*.json"))
+        }
+        self._runner = None
+        self.base_url = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return await self._respond(request.match_info["name"])
+
+    async def _handle_self_hosted(self, request: web.Request) -> web.Response:
+        name = SELF_HOSTED_ROUTES.get((request.match_info["provider"], request.match_info["path"]))
+        if name is None:
+            raise web.HTTPNotFound()
+        return await self._respond(name)
+
+    async def _respond(self, name: str) -> web.Response:
+        body = self._fixtures.get(name)
+        if body is None:
+            raise web.HTTPNotFound()
+        self.requests[name] += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise web.HTTPServiceUnavailable()
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/{name}", self._handle)
+        app.router.add_get("/{provider}/{path}", self._handle_self_hosted)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        await web.SockSite(self._runner, sock).start()
+        self.port = sock.getsockname()[1]
+        self.base_url = f"http://{self.host}:{self.port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def self_hosted_url(self, provider: str) -> str:
+        """Base URL to configure a self-hosted provider with to use this server."""
+        return f"{self.base_url}/{provider}"
+
+    def point_providers_at(self) -> None:
+        """Rewrite the provider endpoints so every request goes to this server."""
+        for (module_name, class_name, attribute), fixture in ROUTES.items():
+            module = importlib.import_module(f"custom_components.geolocator.api.{module_name}")
+            api_class = getattr(module, class_name)
+            endpoint = getattr(api_class, attribute)
+            setattr(api_class, attribute, replace(endpoint, url=f"{self.base_url}/{fixture}"))
+
+
+async def _serve(args) -> None:
+    server = StubServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.fixtures)
+    base_url = await server.start()
+    print(f"Replaying {len(server._fixtures)} fixtures at {base_url}")
+    for (module_name, class_name, attribute), fixture in ROUTES.items():
+        print(f"  {class_name}.{attribute} -> {base_url}/{fixture}")
+    for provider in sorted({provider for provider, _ in SELF_HOSTED_ROUTES}):
+        print(f"  self-hosted {provider} base URL -> {server.self_hosted_url(provider)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        print(json.dumps(dict(server.requests), indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="directory of captured <name>.json responses")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
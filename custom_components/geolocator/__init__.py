@@ -1,29 +1,70 @@
+import asyncio
 import logging
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import Event, HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.service import async_register_admin_service
 
-from .const import DOMAIN, SERVICE_SET_TIMEZONE, API_PROVIDER_META
-from .api.google import GoogleMapsAPI
-from .api.opencage import OpenCageAPI
-from .api.geonames import GeoNamesAPI
-from .api.bigdatacloud import BigDataCloudAPI
-
-from timezonefinder import TimezoneFinder
-
-from openlocationcode import openlocationcode as olc
-
-from babel.dates import get_timezone_name
-from zoneinfo import ZoneInfo
-from datetime import datetime
+from .const import (
+    DOMAIN,
+    SERVICE_SET_TIMEZONE,
+    SERVICE_UPDATE_LOCATION,
+    SERVICE_BUILD_GAZETTEER,
+    SERVICE_RESOLVE_LOCATIONS,
+    CONF_TIMEZONE_MODE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_CACHE_PRECISION,
+    CONF_CACHE_TTL,
+    CONF_MOVEMENT_THRESHOLD,
+    CONF_AUTO_UPDATE,
+    CONF_MIN_INTERVAL,
+    CONF_TIMEZONE_HOLD,
+    CONF_FAILOVER_PROVIDERS,
+    CONF_FAILOVER_API_KEYS,
+    CONF_FAILOVER_BASE_URLS,
+    CONF_BASE_URL,
+    CONF_HEDGE_PERCENTILE,
+    CONF_TRACKERS,
+    DATA_TIMEZONE_ENGINE,
+    DATA_GEOCODE_CACHE,
+    DATA_TIMEZONE_NAMES,
+    DATA_GAZETTEER,
+    DEFAULT_TIMEZONE_MODE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_CACHE_PRECISION,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MOVEMENT_THRESHOLD,
+    DEFAULT_AUTO_UPDATE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_TIMEZONE_HOLD,
+    DEFAULT_HEDGE_PERCENTILE,
+    TIMEZONE_HYSTERESIS_DISTANCE,
+)
+from .bulk import MAX_BULK_LOCATIONS, async_resolve_locations
+from .cache import async_get_geocode_cache
+from .coordinator import GeoLocatorCoordinator
+from .failover import ProviderChain
+from .gazetteer import DEFAULT_GAZETTEER_DATASET, GAZETTEER_DATASETS, async_get_gazetteer
+from .movement import MovementGate, TimezoneHysteresis
+from .names import async_get_timezone_names
+from .providers import async_create_api
+from .snapshots import SnapshotStore
+from .timezone import async_get_timezone_engine
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Startup never waits for the first update; it is abandoned if it takes longer than this
+FIRST_REFRESH_TIMEOUT = 60  # seconds
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     async def async_set_home_timezone(call: ServiceCall):
         await hass.config.async_update(time_zone=call.data["timezone"])
@@ -35,6 +76,46 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         async_set_home_timezone,
         vol.Schema({"timezone": cv.time_zone}),
     )
+
+    async def async_build_gazetteer(call: ServiceCall):
+        await async_get_gazetteer(hass).async_build(async_get_clientsession(hass), call.data["dataset"])
+        # Fill city, state and country right away instead of waiting for the next move
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            for location in (coordinator, *coordinator.trackers.values()):
+                hass.async_create_task(location.async_update_location(force=True))
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_BUILD_GAZETTEER,
+        async_build_gazetteer,
+        vol.Schema({vol.Optional("dataset", default=DEFAULT_GAZETTEER_DATASET): vol.In(GAZETTEER_DATASETS)}),
+    )
+
+    async def async_resolve_locations_service(call: ServiceCall) -> ServiceResponse:
+        coordinators = hass.data.get(DOMAIN, {})
+        entry_id = call.data.get("config_entry_id")
+        coordinator = coordinators.get(entry_id) if entry_id else next(iter(coordinators.values()), None)
+        if coordinator is None:
+            raise ServiceValidationError("No loaded GeoLocator entry to resolve locations with")
+        points = [(location["latitude"], location["longitude"]) for location in call.data["locations"]]
+        return {"results": await async_resolve_locations(coordinator, points, call.data.get("language"))}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESOLVE_LOCATIONS,
+        async_resolve_locations_service,
+        vol.Schema({
+            vol.Required("locations"): vol.All(
+                cv.ensure_list,
+                vol.Length(min=1, max=MAX_BULK_LOCATIONS),
+                [vol.Schema({vol.Required("latitude"): cv.latitude, vol.Required("longitude"): cv.longitude})],
+            ),
+            vol.Optional("language"): cv.string,
+            vol.Optional("config_entry_id"): cv.string,
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -48,136 +129,145 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     else:
         _LOGGER.info("GeoLocator: Using API provider: %s", provider)
 
-    if provider == "google":
-        api = GoogleMapsAPI(api_key)
-    elif provider == "opencage":
-        api = OpenCageAPI(api_key)
-    elif provider == "geonames":
-        api = GeoNamesAPI(api_key)
-    elif provider == "bigdatacloud":
-        api = BigDataCloudAPI()
-    elif provider == "offline":
-        api = None
-    else:
-        raise ValueError(f"Unsupported API provider: {provider}")
-
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
-        "api": api,
-        "entry": entry,
-        "last_address": None,
-        "last_timezone": None,
-        "last_timezone_source": None,
-        "entities": [],
-    }
-
-    async def async_update_location_service(call: ServiceCall | None = None):
-        lat = hass.config.latitude
-        lon = hass.config.longitude
-        _LOGGER.debug("GeoLocator: Fetching location for lat=%s, lon=%s", lat, lon)
-
-        try:
-            address_data = {}
-            timezone_id = None
-            source = None
-            plus_code = olc.encode(lat, lon)
-
-            if api is not None:
-                try:
-                    user_language = hass.config.language or "en"
-                    geocode_raw = await api.reverse_geocode(lat, lon, user_language)
-                    timezone_id = await api.get_timezone(lat, lon, user_language)
-
-                    address_data = {
-                        "current_address": api.format_full_address(geocode_raw),
-                        "city": api.extract_city(geocode_raw),
-                        "state": api.extract_state_long(geocode_raw),
-                        "country": api.extract_country(geocode_raw),
-                        "plus_code": plus_code,
-                    }
-                    source = API_PROVIDER_META[provider]["name"]
-
-                except Exception as e:
-                    _LOGGER.warning("GeoLocator: Failed to update location: %s", e)
-
-            if not timezone_id:
-                try:
-                    def _find_timezone():
-                        tf = TimezoneFinder(in_memory=True)
-                        try:
-                            return tf.timezone_at(lat=lat, lng=lon)
-                        except Exception as e:
-                            _LOGGER.warning("GeoLocator: Exception while finding timezone: %s", e)
-                            return None
-
-                    tz = await hass.async_add_executor_job(_find_timezone)
-                    if tz:
-                        timezone_id = tz
-                        source = "Local Fallback"
-                    else:
-                        source = "Error"
-                except Exception as e:
-                    _LOGGER.warning("GeoLocator: Failed to find local timezone: %s", e)
-
-            # Add full timezone name using Babel and zoneinfo
+    session = async_get_clientsession(hass)
+    timeout = config.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+
+    chain = None
+    api = await async_create_api(hass, provider, session, api_key, timeout, config.get(CONF_BASE_URL))
+    if api is not None:
+        # The configured provider comes first; the failover providers follow in the order chosen
+        apis = [api]
+        failover_keys = config.get(CONF_FAILOVER_API_KEYS, {})
+        failover_urls = config.get(CONF_FAILOVER_BASE_URLS, {})
+        for failover_provider in config.get(CONF_FAILOVER_PROVIDERS, []):
+            if failover_provider in (provider, "offline"):
+                continue
             try:
-                if timezone_id:
-                    tz = ZoneInfo(timezone_id)
-                    dt = datetime.now(tz)
-                    user_locale = hass.config.language or "en-US"
-                    is_dst = dt.dst() is not None and dt.dst().total_seconds() != 0
-                    zone_variant = 'daylight' if is_dst else 'standard'
-
-                    def _get_full_timezone_name():
-                        from babel.dates import get_timezone, get_timezone_name
-                        from babel.core import Locale, UnknownLocaleError
-
-                        tzinfo = get_timezone(timezone_id)
-
-                        try:
-                            loc = Locale.parse(user_locale, sep='-')
-                        except UnknownLocaleError:
-                            loc = Locale.parse("en-US", sep='-')
-
-                        return get_timezone_name(dt, locale=loc)
-
-                    full_name = await hass.async_add_executor_job(_get_full_timezone_name)
-                else:
-                    full_name = None
-            except Exception as e:
-                _LOGGER.warning("GeoLocator: Failed to get full timezone name: %s", e)
-                full_name = None
-
-            hass.data[DOMAIN][entry.entry_id]["last_address"] = address_data
-            hass.data[DOMAIN][entry.entry_id]["last_timezone"] = timezone_id
-            hass.data[DOMAIN][entry.entry_id]["last_timezone_source"] = source
-            hass.data[DOMAIN][entry.entry_id]["last_plus_code"] = plus_code
-            hass.data[DOMAIN][entry.entry_id]["timezone_full"] = full_name
-
-            # Call the timezone-setting service with the computed timezone_id
-            if timezone_id:
-                try:
-                    await hass.services.async_call(
-                        DOMAIN,
-                        SERVICE_SET_TIMEZONE,
-                        {"timezone": timezone_id},
-                        blocking=True
+                apis.append(
+                    await async_create_api(
+                        hass, failover_provider, session, failover_keys.get(failover_provider, ""), timeout,
+                        failover_urls.get(failover_provider),
                     )
-                except Exception as e:
-                    _LOGGER.error("GeoLocator: Failed to call set_home_timezone: %s", e)
-
-            for entity in hass.data[DOMAIN][entry.entry_id]["entities"]:
-                entity.async_schedule_update_ha_state(True)
+                )
+            except ValueError as e:
+                _LOGGER.warning("GeoLocator: Skipping failover provider: %s", e)
+
+        cache = await async_get_geocode_cache(hass)
+        for chain_api in apis:
+            chain_api.use_cache(
+                cache,
+                config.get(CONF_CACHE_PRECISION, DEFAULT_CACHE_PRECISION),
+                config.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL),
+            )
+        chain = ProviderChain(apis, config.get(CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE) or None)
+
+    tz_engine = async_get_timezone_engine(hass, config.get(CONF_TIMEZONE_MODE, DEFAULT_TIMEZONE_MODE))
+
+    def _new_movement_state():
+        return (
+            MovementGate(config.get(CONF_MOVEMENT_THRESHOLD, DEFAULT_MOVEMENT_THRESHOLD)),
+            TimezoneHysteresis(
+                config.get(CONF_TIMEZONE_HOLD, DEFAULT_TIMEZONE_HOLD) * 60, TIMEZONE_HYSTERESIS_DISTANCE
+            ),
+        )
+
+    tz_names = await async_get_timezone_names(hass)
+    gazetteer = async_get_gazetteer(hass)
+    snapshot_store = SnapshotStore(hass, entry.entry_id)
+    await snapshot_store.async_load()
+
+    coordinator = GeoLocatorCoordinator(
+        hass, entry, provider, chain, tz_engine, tz_names, gazetteer, *_new_movement_state(),
+        snapshot_store=snapshot_store,
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_shutdown)
+
+    # Trackers share the provider chain, cache, rate limits and timezone data; only their movement state is their own
+    for tracker_entity_id in config.get(CONF_TRACKERS, []):
+        tracker = GeoLocatorCoordinator(
+            hass, entry, provider, chain, tz_engine, tz_names, gazetteer, *_new_movement_state(),
+            tracker_entity_id=tracker_entity_id, snapshot_store=snapshot_store,
+        )
+        coordinator.trackers[tracker_entity_id] = tracker
+        entry.async_on_unload(tracker.async_shutdown)
+    snapshot_store.async_retain(
+        location.snapshot_key for location in (coordinator, *coordinator.trackers.values())
+    )
 
-        except Exception as e:
-            _LOGGER.exception("GeoLocator: Unexpected error during location update: %s", e)
+    async def _async_update_trackers(force: bool = False):
+        await asyncio.gather(
+            *(tracker.async_update_location(force) for tracker in coordinator.trackers.values())
+        )
 
+    async def async_update_location_service(call: ServiceCall | None = None):
+        force = call is not None and call.data.get("force", False)
+        await coordinator.async_update_location(force)
+        await _async_update_trackers(force)
 
-    hass.data[DOMAIN][entry.entry_id]["update_func"] = async_update_location_service
-    hass.services.async_register(DOMAIN, "update_location", async_update_location_service)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UPDATE_LOCATION,
+        async_update_location_service,
+        vol.Schema({vol.Optional("force", default=False): cv.boolean}),
+    )
 
+    # Sensors start from the snapshots restored from the last run
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
 
-    await async_update_location_service()
+    async def _async_first_refresh():
+        try:
+            async with asyncio.timeout(FIRST_REFRESH_TIMEOUT):
+                await asyncio.gather(coordinator.async_update_location(), _async_update_trackers())
+        except TimeoutError:
+            _LOGGER.warning(
+                "GeoLocator: First update took longer than %ss, keeping the restored values until the next one",
+                FIRST_REFRESH_TIMEOUT,
+            )
+
+    entry.async_create_background_task(hass, _async_first_refresh(), "geolocator_first_refresh")
+
+    if config.get(CONF_AUTO_UPDATE, DEFAULT_AUTO_UPDATE):
+        # Bursts of location changes collapse into at most one update per interval
+        debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=config.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            immediate=True,
+            function=coordinator.async_update_location,
+        )
+        entry.async_on_unload(debouncer.async_shutdown)
+
+        @callback
+        def _async_core_config_updated(event: Event) -> None:
+            # set_home_timezone fires this event too; only react to location changes
+            if "latitude" in event.data or "longitude" in event.data:
+                hass.async_create_task(debouncer.async_call())
+
+        entry.async_on_unload(
+            hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, _async_core_config_updated)
+        )
+
+        tracker_debouncers = {}
+        for tracker_entity_id, tracker in coordinator.trackers.items():
+            tracker_debouncers[tracker_entity_id] = Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=config.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                immediate=True,
+                function=tracker.async_update_location,
+            )
+            entry.async_on_unload(tracker_debouncers[tracker_entity_id].async_shutdown)
+
+        @callback
+        def _async_tracker_changed(event: Event) -> None:
+            hass.async_create_task(tracker_debouncers[event.data["entity_id"]].async_call())
+
+        if tracker_debouncers:
+            entry.async_on_unload(
+                async_track_state_change_event(hass, list(tracker_debouncers), _async_tracker_changed)
+            )
+
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
@@ -187,6 +277,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await SnapshotStore(hass, entry.entry_id).async_remove()
+
+    # The timezone engine outlives reloads; only release it once no entries remain
+    if not hass.data.get(DOMAIN):
+        hass.data.pop(DATA_TIMEZONE_ENGINE, None)
+        hass.data.pop(DATA_GEOCODE_CACHE, None)
+        hass.data.pop(DATA_TIMEZONE_NAMES, None)
+        hass.data.pop(DATA_GAZETTEER, None)
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    # Reload through Home Assistant so the listeners registered with async_on_unload are released
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -1,10 +1,258 @@
+import asyncio
+import logging
+import time
+from functools import partial
+
+import aiohttp
+
+from ..const import API_PROVIDER_META, DEFAULT_CACHE_PRECISION, DEFAULT_CACHE_TTL, DEFAULT_REQUEST_TIMEOUT
+from ..failover import provider_health
+from ..models import Location
+from ..ratelimit import TokenBucket
+from .schema import Endpoint, LocationSchema
+
+_LOGGER = logging.getLogger(__name__)
+
+# Completed responses are reused for identical calls made within this window
+COALESCE_WINDOW = 5  # seconds
+
+# One semaphore and one token bucket per provider, shared by every instance of that provider
+_CONNECTION_LIMITS: dict[str, asyncio.Semaphore] = {}
+RATE_LIMITS: dict[str, TokenBucket] = {}
+
+# Coalesced calls, shared by every instance of a provider so that config
+# entries asking for the same place make one request between them
+_INFLIGHT: dict[tuple, asyncio.Future] = {}
+_WAITERS: dict[tuple, int] = {}
+_RECENT: dict[tuple, tuple[float, object]] = {}
+
+# Google-style string statuses that are answers rather than errors
+OK_STATUSES = ("OK", "ZERO_RESULTS")
+
+
+def _coalesce_done(key: tuple, task: asyncio.Future):
+    _INFLIGHT.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    now = time.monotonic()
+    for expired in [k for k, (at, _) in _RECENT.items() if now - at >= COALESCE_WINDOW]:
+        del _RECENT[expired]
+    _RECENT[key] = (now, task.result())
+
+
+class ProviderError(Exception):
+    """The provider answered with an error payload, e.g. a bad key or an exhausted quota."""
+
+
 class GeoLocatorAPI:
-    """Abstract base class for geolocation APIs."""
+    """Abstract base class for geolocation APIs.
+
+    All providers share Home Assistant's pooled aiohttp session, so TCP and TLS
+    connections are kept alive between updates instead of being rebuilt.
+
+    Providers are declarative: they set the endpoints and the schema mapping
+    the response to a Location, and override methods only for requests that
+    don't fit, e.g. a geocode built from two endpoints.
+    """
+
+    # Key in API_PROVIDER_META
+    provider = None
+    # Whether get_timezone can return a zone; failover skips providers that can't
+    provides_timezone = True
+    # Maximum concurrent requests to this provider across all config entries
+    max_connections = 2
+    # Reverse geocoding request and its response mapping
+    geocode_endpoint: Endpoint | None = None
+    schema: LocationSchema | None = None
+    # Timezone request, with its result spec; without one the zone comes from the schema, if mapped
+    timezone_endpoint: Endpoint | None = None
+    # Server of self-hosted providers, filled into endpoint URLs as {base_url}
+    base_url: str | None = None
+
+    def __init__(self, session: aiohttp.ClientSession, timeout: float | None = None, api_key: str | None = None):
+        self._session = session
+        self.api_key = api_key
+        self._timeout = aiohttp.ClientTimeout(total=timeout or DEFAULT_REQUEST_TIMEOUT)
+        self._cache = None
+        self._cache_precision = DEFAULT_CACHE_PRECISION
+        self._cache_ttl = DEFAULT_CACHE_TTL
+
+    def use_cache(self, cache, precision: int = DEFAULT_CACHE_PRECISION, ttl: float = DEFAULT_CACHE_TTL):
+        """Serve responses from a GeocodeCache keyed on coordinates rounded to precision; a ttl of 0 bypasses it."""
+        self._cache = cache
+        self._cache_precision = precision
+        self._cache_ttl = ttl
 
-    async def reverse_geocode(self, latitude: float, longitude: float, language: str = "en") -> dict:
-        """Return a dict of address components."""
-        raise NotImplementedError
+    @property
+    def _connection_limit(self) -> asyncio.Semaphore:
+        name = type(self).__name__
+        if name not in _CONNECTION_LIMITS:
+            _CONNECTION_LIMITS[name] = asyncio.Semaphore(self.max_connections)
+        return _CONNECTION_LIMITS[name]
+
+    @property
+    def _rate_limit(self) -> TokenBucket | None:
+        meta = API_PROVIDER_META.get(self.provider, {})
+        rate = meta.get("rate_limit")
+        if not rate:
+            return None
+        if self.provider not in RATE_LIMITS:
+            RATE_LIMITS[self.provider] = TokenBucket(rate, meta.get("rate_burst"))
+        return RATE_LIMITS[self.provider]
+
+    async def _get_json(self, url: str, params: dict | None = None, headers: dict | None = None) -> dict:
+        """GET a JSON document through the shared session."""
+        if (rate_limit := self._rate_limit) is not None:
+            await rate_limit.async_acquire()
+        health = provider_health(self.provider)
+        async with self._connection_limit:
+            health.requests += 1
+            start = time.monotonic()
+            try:
+                async with self._session.get(url, params=params, headers=headers, timeout=self._timeout) as resp:
+                    data = await resp.json()
+            except Exception:
+                health.request_errors += 1
+                raise
+            health.record_latency(time.monotonic() - start)
+            return data
+
+    def _template_values(self, latitude: float, longitude: float, language: str) -> dict:
+        """Values for the format fields of endpoint URLs, params and headers."""
+        return {
+            "lat": latitude,
+            "lon": longitude,
+            "language": language,
+            "timestamp": int(time.time()),
+            "api_key": self.api_key,
+            "base_url": self.base_url,
+        }
+
+    async def _request(self, endpoint: Endpoint, latitude: float, longitude: float, language: str):
+        url, params, headers = endpoint.render(self._template_values(latitude, longitude, language))
+        return await self._get_json(url, params, headers or None)
+
+    async def _coalesce(self, key: tuple, factory):
+        """Share one response between identical in-flight or recent calls to this provider."""
+        # Instances on another server or key make different requests
+        key = (self.provider, self.base_url, self.api_key, *key)
+        now = time.monotonic()
+        recent = _RECENT.get(key)
+        if recent is not None and now - recent[0] < COALESCE_WINDOW:
+            return recent[1]
+
+        task = _INFLIGHT.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            _INFLIGHT[key] = task
+            task.add_done_callback(partial(_coalesce_done, key))
+
+        # Shielded so one caller being cancelled doesn't fail the others; the
+        # request itself is only cancelled once nobody is waiting for it
+        _WAITERS[key] = _WAITERS.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if _WAITERS[key] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            _WAITERS[key] -= 1
+            if not _WAITERS[key]:
+                del _WAITERS[key]
+
+    async def _cached(self, method: str, latitude: float, longitude: float, language: str, factory):
+        key = None
+        # A TTL of 0 disables caching: nothing is read, expired or stored
+        if self._cache is not None and self._cache_ttl:
+            key = self._cache.key(self.provider, method, latitude, longitude, language, self._cache_precision)
+            value = self._cache.get(key, self._cache_ttl)
+            if value is not None:
+                return value
+
+        value = await self._coalesce((method, latitude, longitude, language), factory)
+        if key is not None and value:
+            self._cache.set(key, value)
+        return value
+
+    def _response_error(self, data):
+        """The error a raw response reports, or None. An empty result is an answer, not an error."""
+        if not isinstance(data, dict):
+            return None
+        if "error" in data:
+            return str(data["error"])
+        status = data.get("status")
+        # GeoNames reports errors as a status object; OpenCage sends one with code 200 on success
+        if isinstance(status, dict) and status.get("code") != 200:
+            return str(status.get("message") or status)
+        if isinstance(status, str) and status not in OK_STATUSES:
+            return data.get("error_message") or status
+        return None
+
+    def _raise_for_error(self, data) -> None:
+        error = self._response_error(data)
+        if error is not None:
+            raise ProviderError(f"{type(self).__name__}: {error}")
+
+    def _is_valid_response(self, data) -> bool:
+        """Whether a raw response holds a result (not empty and not an error payload)."""
+        if not data:
+            return False
+        if isinstance(data, dict):
+            if self._response_error(data) is not None:
+                return False
+            if "results" in data and not data["results"]:
+                return False
+        return True
+
+    async def _fetch_location(self, latitude: float, longitude: float, language: str):
+        data = await self._reverse_geocode(latitude, longitude, language)
+        self._raise_for_error(data)
+        if not self._is_valid_response(data):
+            _LOGGER.debug("%s: No usable reverse geocode result: %s", type(self).__name__, data)
+            return None
+        # Only the parsed record is kept; the raw payload goes out of scope here
+        return self.parse(data)
+
+    async def reverse_geocode(self, latitude: float, longitude: float, language: str = "en") -> Location | None:
+        """Return the normalized location, or None if the provider had no result.
+
+        Raises ProviderError when the provider answered with an error payload.
+        """
+        return await self._cached(
+            "reverse_geocode", latitude, longitude, language,
+            partial(self._fetch_location, latitude, longitude, language),
+        )
 
     async def get_timezone(self, latitude: float, longitude: float, language: str = "en") -> str:
         """Return an IANA time zone string."""
-        raise NotImplementedError
+        return await self._cached(
+            "get_timezone", latitude, longitude, language,
+            partial(self._get_timezone, latitude, longitude, language),
+        )
+
+    def parse(self, data) -> Location:
+        """Build a Location from a raw response in one pass."""
+        if self.schema is None:
+            raise NotImplementedError
+        return self.schema.parse(data)
+
+    async def _reverse_geocode(self, latitude: float, longitude: float, language: str) -> dict:
+        """Fetch address components from the provider."""
+        if self.geocode_endpoint is None:
+            raise NotImplementedError
+        data = await self._request(self.geocode_endpoint, latitude, longitude, language)
+        _LOGGER.debug("%s reverse geocode response: %s", type(self).__name__, data)
+        return data
+
+    async def _get_timezone(self, latitude: float, longitude: float, language: str) -> str:
+        """Fetch the IANA time zone from the provider."""
+        if self.timezone_endpoint is not None:
+            data = await self._request(self.timezone_endpoint, latitude, longitude, language)
+            self._raise_for_error(data)
+            return self.timezone_endpoint.extract(data)
+        if self.schema is not None and "timezone" in self.schema.fields:
+            # Shares the in-flight/recent geocode response instead of fetching it again
+            location = await self.reverse_geocode(latitude, longitude, language)
+            return location.timezone if location else None
+        return None
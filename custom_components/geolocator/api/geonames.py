@@ -1,79 +1,88 @@
-import aiohttp
+import asyncio
+import logging
+
 from .base import GeoLocatorAPI
+from .schema import Endpoint, Join, LocationSchema, compile_spec
+
+_LOGGER = logging.getLogger(__name__)
 
 GEONAMES_REVERSE_URL = "http://api.geonames.org/findNearestAddressJSON"
 GEONAMES_PLACE_URL = "http://api.geonames.org/findNearbyPlaceNameJSON"
 GEONAMES_TIMEZONE_URL = "http://api.geonames.org/timezoneJSON"
 
-class GeoNamesAPI(GeoLocatorAPI):
-    def __init__(self, username: str):
-        self.username = username
-
-    async def reverse_geocode(self, lat, lon, language="en"):
-        async with aiohttp.ClientSession() as session:
-            reverse_resp = await session.get(GEONAMES_REVERSE_URL, params={"lat": lat, "lng": lon, "username": self.username})
-            place_resp = await session.get(GEONAMES_PLACE_URL, params={"lat": lat, "lng": lon, "username": self.username, "cities": "cities500"})
-            reverse_data = await reverse_resp.json()
-            place_data = await place_resp.json()
-            return {"reverse": reverse_data, "place": place_data}
-
-    async def get_timezone(self, lat, lon, language="en"):
-        params = {
-            "lat": lat,
-            "lng": lon,
-            "username": self.username,
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(GEONAMES_TIMEZONE_URL, params=params) as resp:
-                data = await resp.json()
-                return data.get("timezoneId")
-
-    def _get_top_result(self, data):
-        if "geonames" in data:
-            return data.get("geonames", [{}])[0]
-        elif "address" in data:
-            return data["address"]
-        return {}
-
-    def format_full_address(self, data):
-        reverse_top = self._get_top_result(data.get("reverse", {}))
-        place_top = self._get_top_result(data.get("place", {}))
-
-        # Combine street number + street (no comma)
-        street_number = reverse_top.get("streetNumber")
-        street = reverse_top.get("street")
-        street_line = f"{street_number} {street}".strip() if street or street_number else None
+# The nearest address answers as an object, or as a list when GeoNames has no street data
+REVERSE = ("reverse.address", "reverse.geonames.0")
+PLACE = "place.geonames.0"
+# GeoNames error "no result found": an empty answer, not a failure
+NO_RESULT_ERROR = 15
 
-        # City / locality with fallback
-        placename = reverse_top.get("placename")
-        if not placename:
-            placename = place_top.get("name")  # Fallback to populated place name
 
-        # Combine state + postal code (no comma)
-        admin = reverse_top.get("adminCode1")
-        postal = reverse_top.get("postalcode")
-        region_line = f"{admin} {postal}".strip() if admin or postal else None
+def _reverse(key: str) -> tuple:
+    return tuple(f"{path}.{key}" for path in REVERSE)
 
-        country = place_top.get("countryName")
 
-        # Final join with correct commas
-        return ", ".join(filter(None, [street_line, placename, region_line, country]))
-
-
-    def extract_city(self, data):
-        reverse_top = self._get_top_result(data.get("reverse", {}))
-        city = reverse_top.get("placename")
-
-        if not city:
-            place_top = self._get_top_result(data.get("place", {}))
-            city = place_top.get("name")  # Fallback to nearby populated place name
-
-        return city
-
-    def extract_state_long(self, data):
-        reverse_top = self._get_top_result(data["reverse"])
-        return reverse_top.get("adminName1")
-
-    def extract_country(self, data):
-        place_top = self._get_top_result(data["place"])
-        return place_top.get("countryName")
+class GeoNamesAPI(GeoLocatorAPI):
+    provider = "geonames"
+
+    reverse_endpoint = Endpoint(GEONAMES_REVERSE_URL, {"lat": "{lat}", "lng": "{lon}", "username": "{api_key}"})
+    place_endpoint = Endpoint(
+        GEONAMES_PLACE_URL, {"lat": "{lat}", "lng": "{lon}", "username": "{api_key}", "cities": "cities500"}
+    )
+    timezone_endpoint = Endpoint(
+        GEONAMES_TIMEZONE_URL, {"lat": "{lat}", "lng": "{lon}", "username": "{api_key}"}, result="timezoneId"
+    )
+    # Parses {"reverse": nearest address, "place": nearby populated place}
+    schema = LocationSchema(
+        address=Join(", ", (
+            Join(" ", (_reverse("streetNumber"), _reverse("street"))),
+            # City / locality with fallback to the nearby populated place
+            (*_reverse("placename"), f"{PLACE}.name"),
+            Join(" ", (_reverse("adminCode1"), _reverse("postalcode"))),
+            f"{PLACE}.countryName",
+        )),
+        city=(*_reverse("placename"), f"{PLACE}.name"),
+        state=_reverse("adminName1"),
+        country=f"{PLACE}.countryName",
+    )
+    _has_result = staticmethod(compile_spec((*REVERSE, PLACE)))
+
+    def __init__(self, session, username: str, timeout=None):
+        super().__init__(session, timeout, username)
+
+    async def _reverse_geocode(self, lat, lon, language="en"):
+        reverse_data, place_data = await asyncio.gather(
+            self._request(self.reverse_endpoint, lat, lon, language),
+            self._request(self.place_endpoint, lat, lon, language),
+            return_exceptions=True,
+        )
+        # Keep whichever half succeeded; the schema already falls back between the two
+        if isinstance(reverse_data, BaseException) and isinstance(place_data, BaseException):
+            raise reverse_data
+        if isinstance(reverse_data, BaseException):
+            _LOGGER.warning("GeoNames: Nearest address lookup failed: %s", reverse_data)
+            reverse_data = {}
+        if isinstance(place_data, BaseException):
+            _LOGGER.warning("GeoNames: Nearby place lookup failed: %s", place_data)
+            place_data = {}
+        return {"reverse": reverse_data, "place": place_data}
+
+    def _response_error(self, data):
+        halves = (data,)
+        if isinstance(data, dict) and "reverse" in data:
+            # Either half answering is enough
+            if self._has_result(data) is not None:
+                return None
+            halves = (data["reverse"], data["place"])
+        for half in halves:
+            status = half.get("status") if isinstance(half, dict) else None
+            if isinstance(status, dict) and status.get("value") == NO_RESULT_ERROR:
+                continue
+            error = super()._response_error(half)
+            if error is not None:
+                return error
+        return None
+
+    def _is_valid_response(self, data):
+        if not isinstance(data, dict) or "reverse" not in data:
+            return super()._is_valid_response(data)
+        return self._has_result(data) is not None
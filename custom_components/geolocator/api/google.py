@@ -1,61 +1,42 @@
-import aiohttp
 from .base import GeoLocatorAPI
+from .schema import Endpoint, LocationSchema, Transform
 
 GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 TIMEZONE_URL = "https://maps.googleapis.com/maps/api/timezone/json"
 
+LOCATION_TYPE_CONFIDENCE = {
+    "ROOFTOP": 1.0,
+    "RANGE_INTERPOLATED": 0.8,
+    "GEOMETRIC_CENTER": 0.6,
+    "APPROXIMATE": 0.4,
+}
+
+
+def _component(component_type: str) -> str:
+    # Results run from most to least specific; the first one carrying the component type wins
+    return f"results.*.address_components[types~{component_type}].long_name"
+
+
 class GoogleMapsAPI(GeoLocatorAPI):
-    def __init__(self, api_key, language="en"):
-        self.api_key = api_key
-
-    async def reverse_geocode(self, lat, lon, language="en"):
-        async with aiohttp.ClientSession() as session:
-            params = {
-                "latlng": f"{lat},{lon}",
-                "key": self.api_key,
-                "language": language,
-            }
-            async with session.get(GEOCODE_URL, params=params) as resp:
-                return await resp.json()
-
-    async def get_timezone(self, lat, lon, language="en"):
-        import time
-        import logging
-        _LOGGER = logging.getLogger(__name__)
-
-        timestamp = int(time.time())
-        async with aiohttp.ClientSession() as session:
-            params = {
-                "location": f"{lat},{lon}",
-                "timestamp": timestamp,
-                "key": self.api_key,
-                "language": language,
-            }
-            async with session.get(TIMEZONE_URL, params=params) as resp:
-                data = await resp.json()
-                _LOGGER.debug("Google Timezone API response: %s", data)
-                return data.get("timeZoneId")
-
-    def _get_component(self, data, type_name):
-        for result in data.get("results", []):
-            for comp in result.get("address_components", []):
-                if type_name in comp.get("types", []):
-                    return comp.get("long_name")
-        return None
-
-    def format_full_address(self, data):
-        if not data.get("results"):
-            return ""
-        return data["results"][0].get("formatted_address", "")
-
-    def extract_neighborhood(self, data):
-        return self._get_component(data, "neighborhood")
-
-    def extract_city(self, data):
-        return self._get_component(data, "locality")
-
-    def extract_state_long(self, data):
-        return self._get_component(data, "administrative_area_level_1")
-
-    def extract_country(self, data):
-        return self._get_component(data, "country")
+    provider = "google"
+    max_connections = 4
+
+    geocode_endpoint = Endpoint(
+        GEOCODE_URL, {"latlng": "{lat},{lon}", "key": "{api_key}", "language": "{language}"}
+    )
+    timezone_endpoint = Endpoint(
+        TIMEZONE_URL,
+        {"location": "{lat},{lon}", "timestamp": "{timestamp}", "key": "{api_key}", "language": "{language}"},
+        result="timeZoneId",
+    )
+    schema = LocationSchema(
+        address="results.0.formatted_address",
+        neighborhood=_component("neighborhood"),
+        city=_component("locality"),
+        state=_component("administrative_area_level_1"),
+        country=_component("country"),
+        confidence=Transform("results.0.geometry.location_type", LOCATION_TYPE_CONFIDENCE.get),
+    )
+
+    def __init__(self, session, api_key, timeout=None):
+        super().__init__(session, timeout, api_key)
@@ -1,58 +1,25 @@
-import aiohttp
-import logging
 from .base import GeoLocatorAPI
+from .schema import Endpoint, LocationSchema, Transform
 
-_LOGGER = logging.getLogger(__name__)
 GEOCODE_URL = "https://api.opencagedata.com/geocode/v1/json"
 
 class OpenCageAPI(GeoLocatorAPI):
-    def __init__(self, api_key, language="en"):
-        self.api_key = api_key
-        self.language = language
-
-    async def reverse_geocode(self, lat, lon, language="en"):
-        async with aiohttp.ClientSession() as session:
-            params = {
-                "q": f"{lat},{lon}",
-                "key": self.api_key,
-                "language": language,
-            }
-            async with session.get(GEOCODE_URL, params=params) as resp:
-                data = await resp.json()
-                _LOGGER.debug("OpenCage reverse geocode response: %s", data)
-                return data
-
-    async def get_timezone(self, lat, lon, language="en"):
-        data = await self.reverse_geocode(lat, lon, language)
-        try:
-            return data["results"][0]["annotations"]["timezone"]["name"]
-        except (IndexError, KeyError):
-            _LOGGER.warning("OpenCage: Failed to extract timezone from response")
-            return None
-
-    def format_full_address(self, data):
-        try:
-            return data["results"][0]["formatted"]
-        except (IndexError, KeyError):
-            return ""
-
-    def extract_city(self, data):
-        try:
-            return data["results"][0]["components"].get("city") or \
-                   data["results"][0]["components"].get("town") or \
-                   data["results"][0]["components"].get("village") or \
-                   data["results"][0]["components"].get("county")
-        except (IndexError, KeyError):
-            return None
-
-    def extract_state_long(self, data):
-        try:
-            return data["results"][0]["components"].get("state")
-        except (IndexError, KeyError):
-            return None
-
-    def extract_country(self, data):
-        try:
-            return data["results"][0]["components"].get("country")
-        except (IndexError, KeyError):
-            return None
+    provider = "opencage"
+    max_connections = 1  # free tier allows one request per second
+
+    geocode_endpoint = Endpoint(GEOCODE_URL, {"q": "{lat},{lon}", "key": "{api_key}", "language": "{language}"})
+    # The timezone comes from the geocode response's annotations
+    schema = LocationSchema(
+        root="results.0",
+        address="formatted",
+        neighborhood=("components.neighbourhood", "components.suburb"),
+        city=("components.city", "components.town", "components.village", "components.county"),
+        state="components.state",
+        country="components.country",
+        timezone="annotations.timezone.name",
+        # OpenCage rates the match 1-10 by the size of its bounding box
+        confidence=Transform("confidence", lambda confidence: confidence / 10),
+    )
+
+    def __init__(self, session, api_key, timeout=None):
+        super().__init__(session, timeout, api_key)
@@ -1,46 +1,51 @@
-import aiohttp
+from dataclasses import replace
+
 from .base import GeoLocatorAPI
+from .schema import Endpoint, LocationSchema
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = "geo_locator_home_assistant"
+# Nominatim's answer for a point with nothing to geocode, e.g. at sea
+NO_RESULT_ERROR = "Unable to geocode"
 
 class OSMAPI(GeoLocatorAPI):
     """GeoLocator API using OpenStreetMap's Nominatim service."""
 
-    def __init__(self, user_agent: str = "geo_locator_home_assistant"):
-        self.user_agent = user_agent
+    provider = "osm"
+    max_connections = 1  # Nominatim usage policy: a single connection
+    # OSM does not provide timezone info
+    provides_timezone = False
 
-    async def reverse_geocode(self, latitude, longitude):
-        headers = {
-            "User-Agent": self.user_agent
-        }
-        params = {
-            "lat": latitude,
-            "lon": longitude,
-            "format": "jsonv2",
-            "addressdetails": 1,
-        }
+    geocode_endpoint = Endpoint(
+        NOMINATIM_URL,
+        {"lat": "{lat}", "lon": "{lon}", "format": "jsonv2", "addressdetails": 1, "accept-language": "{language}"},
+        {"User-Agent": USER_AGENT},
+    )
+    schema = LocationSchema(
+        address="display_name",
+        neighborhood="address.neighbourhood",
+        city=("address.city", "address.town", "address.village"),
+        state="address.state",
+        country="address.country",
+    )
 
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(NOMINATIM_URL, params=params) as resp:
-                return await resp.json()
+    def _response_error(self, data):
+        if isinstance(data, dict) and data.get("error") == NO_RESULT_ERROR:
+            return None
+        return super()._response_error(data)
 
-    async def get_timezone(self, latitude, longitude):
-        # OSM does not provide timezone info
-        return None
+    def _is_valid_response(self, data) -> bool:
+        return super()._is_valid_response(data) and not (isinstance(data, dict) and "error" in data)
 
-    def format_full_address(self, data):
-        return data.get("display_name", "")
 
-    def extract_neighborhood(self, data):
-        return data.get("address", {}).get("neighbourhood")
+class SelfHostedNominatimAPI(OSMAPI):
+    """Nominatim on your own server: same API as the public service, without its usage limits."""
 
-    def extract_city(self, data):
-        return data.get("address", {}).get("city") or \
-               data.get("address", {}).get("town") or \
-               data.get("address", {}).get("village")
+    provider = "nominatim"
+    max_connections = 4
 
-    def extract_state_long(self, data):
-        return data.get("address", {}).get("state")
+    geocode_endpoint = replace(OSMAPI.geocode_endpoint, url="{base_url}/reverse")
 
-    def extract_country(self, data):
-        return data.get("address", {}).get("country")
+    def __init__(self, session, base_url: str, timeout=None):
+        super().__init__(session, timeout)
+        self.base_url = base_url.rstrip("/")
@@ -0,0 +1,37 @@
+from .base import GeoLocatorAPI
+from .schema import Endpoint, Join, LocationSchema
+
+
+class PhotonAPI(GeoLocatorAPI):
+    """GeoLocator API using a self-hosted Photon server (OpenStreetMap data)."""
+
+    provider = "photon"
+    max_connections = 4
+    # Photon does not provide timezone info
+    provides_timezone = False
+
+    # No lang parameter: Photon rejects languages its index wasn't built with,
+    # so names come in the local language
+    geocode_endpoint = Endpoint("{base_url}/reverse", {"lat": "{lat}", "lon": "{lon}", "limit": 1})
+    schema = LocationSchema(
+        root="features.0.properties",
+        address=Join(", ", (
+            Join(" ", ("housenumber", "street")),
+            "city",
+            "state",
+            "postcode",
+            "country",
+        )),
+        neighborhood=("district", "locality"),
+        city="city",
+        state="state",
+        country="country",
+    )
+
+    def __init__(self, session, base_url: str, timeout=None):
+        super().__init__(session, timeout)
+        self.base_url = base_url.rstrip("/")
+
+    def _is_valid_response(self, data) -> bool:
+        # No match is an empty FeatureCollection rather than an error
+        return super()._is_valid_response(data) and isinstance(data, dict) and bool(data.get("features"))
@@ -0,0 +1,212 @@
+"""Declarative request and response mapping for provider APIs.
+
+A provider declares its endpoints and, for each Location field, where the
+value sits in the JSON response. Paths are dotted keys and list indexes with a
+few selectors for the shapes providers use:
+
+    results.0.formatted                       key, key, index, key
+    results.*.address_components              every element of a list, in order
+    address_components[types~locality]        elements whose "types" list contains "locality"
+    informative[description=time zone]        elements whose "description" is "time zone" (any case)
+
+A path resolves to the first non-empty value it reaches. Specs compile once,
+when the provider module is imported, into closures, so parsing a response is
+one call per field with no path handling left to do.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from ..models import Location
+
+_SELECTOR = re.compile(r"^(?P<key>[^\[]*)\[(?P<attr>[^=~\]]+)(?P<op>[=~])(?P<value>[^\]]*)\]$")
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """A GET request; str.format fields in the URL, params and headers are filled per request.
+
+    result optionally names the one value the endpoint is called for, as a spec.
+    """
+
+    url: str
+    params: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    result: object = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "_extract", compile_spec(self.result) if self.result is not None else None)
+
+    def extract(self, data):
+        return self._extract(data) if self._extract is not None else data
+
+    def render(self, values: dict) -> tuple[str, dict, dict]:
+        def fill(mapping):
+            return {
+                key: value.format(**values) if isinstance(value, str) else value
+                for key, value in mapping.items()
+            }
+
+        return self.url.format(**values), fill(self.params), fill(self.headers)
+
+
+@dataclass(frozen=True)
+class Join:
+    """Non-empty values of several specs joined with a separator."""
+
+    separator: str
+    parts: tuple
+
+
+@dataclass(frozen=True)
+class Transform:
+    """The value of a spec passed through a function; None stays None."""
+
+    spec: object
+    function: object
+
+
+def _terminal(node):
+    # Empty strings and containers count as missing; zero does not
+    return node if node or node == 0 else None
+
+
+def _compile_steps(steps: tuple, following):
+    # Keys and indexes only: one direct walk
+    if following is _terminal:
+        def _get(node):
+            try:
+                for step in steps:
+                    node = node[step]
+            except (KeyError, IndexError, TypeError):
+                return None
+            return node if node or node == 0 else None
+        return _get
+
+    def _get_then(node):
+        try:
+            for step in steps:
+                node = node[step]
+        except (KeyError, IndexError, TypeError):
+            return None
+        return following(node)
+
+    return _get_then
+
+
+def _compile_selector(step: str, following):
+    if step == "*":
+        def _each(node):
+            if isinstance(node, list):
+                for child in node:
+                    value = following(child)
+                    if value is not None:
+                        return value
+            return None
+        return _each
+
+    match = _SELECTOR.match(step)
+    if match is None:
+        raise ValueError(f"Invalid path step: {step}")
+    attr, op, expected = match["attr"], match["op"], match["value"].lower()
+    if op == "~":
+        def _wanted(child):
+            return expected in child.get(attr, ())
+    else:
+        def _wanted(child):
+            return str(child.get(attr, "")).lower() == expected
+
+    def _select(node):
+        if isinstance(node, list):
+            for child in node:
+                if isinstance(child, dict) and _wanted(child):
+                    value = following(child)
+                    if value is not None:
+                        return value
+        return None
+
+    if match["key"]:
+        return _compile_steps((match["key"],), _select)
+    return _select
+
+
+def compile_path(path: str):
+    """Return a function giving the first non-empty value at path, or None.
+
+    Wildcards and selectors backtrack: if the first matching element has no
+    value further down the path, the next one is tried.
+    """
+    walk = _terminal
+    plain = []
+    for step in reversed(path.split(".")):
+        if step == "*" or "[" in step:
+            if plain:
+                walk = _compile_steps(tuple(reversed(plain)), walk)
+                plain = []
+            walk = _compile_selector(step, walk)
+        else:
+            plain.append(int(step) if step.lstrip("-").isdigit() else step)
+    if plain:
+        walk = _compile_steps(tuple(reversed(plain)), walk)
+    return walk
+
+
+def compile_spec(spec):
+    """Compile a field spec: a path, a tuple of fallback specs, a Join or a Transform."""
+    if isinstance(spec, str):
+        return compile_path(spec)
+
+    if isinstance(spec, Join):
+        parts = [compile_spec(part) for part in spec.parts]
+        separator = spec.separator
+
+        def _join(data):
+            values = [str(value) for part in parts if (value := part(data)) is not None]
+            return separator.join(values) or None
+        return _join
+
+    if isinstance(spec, Transform):
+        inner = compile_spec(spec.spec)
+        function = spec.function
+
+        def _transform(data):
+            value = inner(data)
+            return None if value is None else function(value)
+        return _transform
+
+    alternatives = [compile_spec(alternative) for alternative in spec]
+
+    def _first_of(data):
+        for alternative in alternatives:
+            value = alternative(data)
+            if value is not None:
+                return value
+        return None
+    return _first_of
+
+
+class LocationSchema:
+    """Location fields mapped to specs, compiled once and evaluated together.
+
+    With a root path, field paths are relative to the value there, which is
+    looked up once per response.
+    """
+
+    def __init__(self, root: str | None = None, **fields):
+        unknown = set(fields) - set(Location.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown Location fields: {', '.join(sorted(unknown))}")
+        self._root = compile_path(root) if root else None
+        self._extractors = tuple((name, compile_spec(spec)) for name, spec in fields.items())
+
+    @property
+    def fields(self) -> tuple:
+        return tuple(name for name, _ in self._extractors)
+
+    def parse(self, data) -> Location:
+        if self._root is not None:
+            data = self._root(data)
+            if data is None:
+                return Location()
+        return Location(**{name: extract(data) for name, extract in self._extractors})
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from dataclasses import asdict
+
+from .const import CONF_CACHE_PRECISION, DEFAULT_CACHE_PRECISION
+from .models import Location
+
+_LOGGER = logging.getLogger(__name__)
+
+# Cells resolved at once; provider rate limits and connection caps still apply per request
+BULK_CONCURRENCY = 4
+MAX_BULK_LOCATIONS = 1000
+
+
+async def async_resolve_locations(coordinator, points: list, language: str | None = None) -> list:
+    """Resolve many (latitude, longitude) points to normalized records, in input order.
+
+    Points that round to the same cache cell are resolved once, with the
+    rounded coordinates, so repeats and points the cache already holds cost
+    no requests. Timezones and places the providers can't supply come from one
+    batched offline lookup each.
+    """
+    hass = coordinator.hass
+    config = coordinator.entry.options or coordinator.entry.data
+    precision = config.get(CONF_CACHE_PRECISION, DEFAULT_CACHE_PRECISION)
+    language = language or hass.config.language or "en"
+
+    cells = {}
+    for index, (lat, lon) in enumerate(points):
+        cells.setdefault((round(lat, precision), round(lon, precision)), []).append(index)
+    cell_points = list(cells)
+    results = {cell: (None, None, None) for cell in cell_points}
+
+    if coordinator.chain is not None:
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        async def _async_resolve_cell(cell):
+            async with semaphore:
+                results[cell] = await coordinator.async_query_providers(*cell, language)
+
+        await asyncio.gather(*(_async_resolve_cell(cell) for cell in cell_points))
+
+    missing_timezone = [cell for cell in cell_points if not results[cell][1]]
+    if missing_timezone:
+        await coordinator.tz_engine.async_load()
+        zones = await hass.async_add_executor_job(coordinator.tz_engine.timezones_at, missing_timezone)
+        for cell, zone in zip(missing_timezone, zones):
+            location, _, source = results[cell]
+            results[cell] = (location, zone, "Local Fallback" if zone else source)
+
+    missing_place = [cell for cell in cell_points if results[cell][0] is None]
+    if missing_place and await coordinator.gazetteer.async_load():
+        places = await hass.async_add_executor_job(coordinator.gazetteer.nearest_many, missing_place)
+        for cell, place in zip(missing_place, places):
+            if place:
+                results[cell] = (place, *results[cell][1:])
+
+    _LOGGER.debug("GeoLocator: Resolved %d points in %d cells", len(points), len(cell_points))
+
+    records = [None] * len(points)
+    for cell, indexes in cells.items():
+        location, timezone_id, source = results[cell]
+        record = asdict(location or Location())
+        record.update(timezone=timezone_id, source=source)
+        for index in indexes:
+            lat, lon = points[index]
+            records[index] = {"latitude": lat, "longitude": lon, **record}
+    return records
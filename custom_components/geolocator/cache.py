@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_GEOCODE_CACHE,
+    DEFAULT_CACHE_PRECISION,
+    DEFAULT_CACHE_TTL,
+    DOMAIN,
+)
+from .models import Location
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.geocode_cache"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # seconds
+MAX_ENTRIES = 512
+# Bumped when the shape of cached values changes; older entries are dropped on load
+CACHE_FORMAT = 2
+
+
+class GeocodeCache:
+    """Provider responses keyed on rounded coordinates, persisted across restarts.
+
+    Entries expire after a TTL and the least recently used entry is evicted once
+    the cache is full.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_entries: int = MAX_ENTRIES):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            if data.get("format") != CACHE_FORMAT:
+                data = {}
+            # Stored oldest first, so LRU order survives the round trip; expiry is checked on read
+            for key, (stored_at, value) in data.get("entries", {}).items():
+                self._entries[key] = (stored_at, Location(**value) if isinstance(value, dict) else value)
+            self._loaded = True
+            _LOGGER.debug("GeoLocator: Restored %d cached geocode entries", len(self._entries))
+
+    @staticmethod
+    def key(provider: str, method: str, latitude: float, longitude: float, language: str,
+            precision: int = DEFAULT_CACHE_PRECISION) -> str:
+        return f"{provider}|{method}|{latitude:.{precision}f}|{longitude:.{precision}f}|{language}"
+
+    @callback
+    def get(self, key: str, ttl: float = DEFAULT_CACHE_TTL):
+        """Return a cached value, or None if missing or older than ttl hours."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() - entry[0] >= ttl * 3600:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    @callback
+    def set(self, key: str, value) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {
+            "format": CACHE_FORMAT,
+            "entries": {
+                key: (stored_at, asdict(value) if isinstance(value, Location) else value)
+                for key, (stored_at, value) in self._entries.items()
+            },
+        }
+
+    def diagnostics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+
+async def async_get_geocode_cache(hass: HomeAssistant) -> GeocodeCache:
+    """Return the shared geocode cache, restoring it from storage on first use."""
+    cache = hass.data.get(DATA_GEOCODE_CACHE)
+    if cache is None:
+        cache = GeocodeCache(hass)
+        hass.data[DATA_GEOCODE_CACHE] = cache
+    await cache.async_load()
+    return cache
@@ -4,12 +4,59 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import selector
 
-from .const import DOMAIN, CONF_API_KEY, CONF_API_PROVIDER, API_PROVIDER_META
+from .const import (
+    DOMAIN,
+    CONF_API_KEY,
+    CONF_API_PROVIDER,
+    CONF_BASE_URL,
+    CONF_TIMEZONE_MODE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_CACHE_PRECISION,
+    CONF_CACHE_TTL,
+    CONF_MOVEMENT_THRESHOLD,
+    CONF_AUTO_UPDATE,
+    CONF_MIN_INTERVAL,
+    CONF_TIMEZONE_HOLD,
+    CONF_FAILOVER_PROVIDERS,
+    CONF_FAILOVER_API_KEYS,
+    CONF_FAILOVER_BASE_URLS,
+    CONF_HEDGE_PERCENTILE,
+    CONF_TRACKERS,
+    CONF_DEBUG_SENSORS,
+    API_PROVIDER_META,
+    DEFAULT_TIMEZONE_MODE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_CACHE_PRECISION,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_MOVEMENT_THRESHOLD,
+    DEFAULT_AUTO_UPDATE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_TIMEZONE_HOLD,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_DEBUG_SENSORS,
+    TIMEZONE_MODES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _provider_label(meta: dict) -> str:
+    if meta.get("needs_url"):
+        return f"{meta['name']} (server URL required)"
+    return f"{meta['name']} (no key required)" if not meta["needs_key"] else meta["name"]
+
+
+def _url_error(value: str):
+    try:
+        cv.url(value)
+    except vol.Invalid:
+        return "invalid_url"
+    return None
+
+
 class GeoLocatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -24,10 +71,7 @@ class GeoLocatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._selected_provider = user_input[CONF_API_PROVIDER]
             return await self.async_step_credentials()
 
-        provider_options = {
-            k: f"{v['name']} (no key required)" if not v['needs_key'] else v['name']
-            for k, v in API_PROVIDER_META.items()
-        }
+        provider_options = {k: _provider_label(v) for k, v in API_PROVIDER_META.items()}
 
         return self.async_show_form(
             step_id="user",
@@ -44,14 +88,21 @@ class GeoLocatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         provider_meta = API_PROVIDER_META.get(provider, {})
 
         if user_input is not None:
-            return self.async_create_entry(
-                title="GeoLocator",
-                data={
-                    CONF_API_PROVIDER: provider,
-                    CONF_API_KEY: user_input.get(CONF_API_KEY, "")
-                }
-            )
+            data = {CONF_API_PROVIDER: provider, CONF_API_KEY: user_input.get(CONF_API_KEY, "")}
+            if provider_meta.get("needs_url"):
+                data[CONF_BASE_URL] = user_input.get(CONF_BASE_URL, "")
+                if error := _url_error(data[CONF_BASE_URL]):
+                    self._errors[CONF_BASE_URL] = error
+            if not self._errors:
+                return self.async_create_entry(title="GeoLocator", data=data)
 
+        if provider_meta.get("needs_url"):
+            return self.async_show_form(
+                step_id="credentials",
+                data_schema=vol.Schema({vol.Required(CONF_BASE_URL): str}),
+                errors=self._errors,
+                description_placeholders={}
+            )
         if provider_meta.get("needs_key"):
             return self.async_show_form(
                 step_id="credentials",
@@ -77,28 +128,87 @@ class GeoLocatorOptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
         super().__init__(config_entry)
         self._errors = {}
         self._selected_provider = None
+        self._settings = {}
 
     async def async_step_init(self, user_input=None):
         self._errors = {}
 
         if user_input is not None:
             self._selected_provider = user_input[CONF_API_PROVIDER]
+            self._settings = {
+                CONF_TIMEZONE_MODE: user_input[CONF_TIMEZONE_MODE],
+                CONF_REQUEST_TIMEOUT: user_input[CONF_REQUEST_TIMEOUT],
+                CONF_CACHE_PRECISION: user_input[CONF_CACHE_PRECISION],
+                CONF_CACHE_TTL: user_input[CONF_CACHE_TTL],
+                CONF_MOVEMENT_THRESHOLD: user_input[CONF_MOVEMENT_THRESHOLD],
+                CONF_AUTO_UPDATE: user_input[CONF_AUTO_UPDATE],
+                CONF_MIN_INTERVAL: user_input[CONF_MIN_INTERVAL],
+                CONF_TIMEZONE_HOLD: user_input[CONF_TIMEZONE_HOLD],
+                CONF_FAILOVER_PROVIDERS: [
+                    p for p in user_input[CONF_FAILOVER_PROVIDERS]
+                    if p != self._selected_provider
+                ],
+                CONF_HEDGE_PERCENTILE: user_input[CONF_HEDGE_PERCENTILE],
+                CONF_TRACKERS: user_input.get(CONF_TRACKERS, []),
+                CONF_DEBUG_SENSORS: user_input[CONF_DEBUG_SENSORS],
+            }
             return await self.async_step_options_credentials()
 
-        provider_options = {
-            k: f"{v['name']} (no key required)" if not v['needs_key'] else v['name']
-            for k, v in API_PROVIDER_META.items()
-        }
+        provider_options = {k: _provider_label(v) for k, v in API_PROVIDER_META.items()}
+
+        failover_options = {k: v["name"] for k, v in API_PROVIDER_META.items() if k != "offline"}
 
         current_provider = self.config_entry.options.get(
             CONF_API_PROVIDER,
             self.config_entry.data.get(CONF_API_PROVIDER)
         )
+        current_timezone_mode = self.config_entry.options.get(CONF_TIMEZONE_MODE, DEFAULT_TIMEZONE_MODE)
+        current_timeout = self.config_entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+        current_precision = self.config_entry.options.get(CONF_CACHE_PRECISION, DEFAULT_CACHE_PRECISION)
+        current_ttl = self.config_entry.options.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL)
+        current_threshold = self.config_entry.options.get(CONF_MOVEMENT_THRESHOLD, DEFAULT_MOVEMENT_THRESHOLD)
+        current_auto_update = self.config_entry.options.get(CONF_AUTO_UPDATE, DEFAULT_AUTO_UPDATE)
+        current_interval = self.config_entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        current_hold = self.config_entry.options.get(CONF_TIMEZONE_HOLD, DEFAULT_TIMEZONE_HOLD)
+        current_failover = self.config_entry.options.get(CONF_FAILOVER_PROVIDERS, [])
+        current_hedge = self.config_entry.options.get(CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE)
+        current_trackers = self.config_entry.options.get(CONF_TRACKERS, [])
+        current_debug_sensors = self.config_entry.options.get(CONF_DEBUG_SENSORS, DEFAULT_DEBUG_SENSORS)
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
-                vol.Required(CONF_API_PROVIDER, default=current_provider): vol.In(provider_options)
+                vol.Required(CONF_API_PROVIDER, default=current_provider): vol.In(provider_options),
+                vol.Required(CONF_TIMEZONE_MODE, default=current_timezone_mode): vol.In(TIMEZONE_MODES),
+                vol.Required(CONF_REQUEST_TIMEOUT, default=current_timeout): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=120)
+                ),
+                vol.Required(CONF_CACHE_PRECISION, default=current_precision): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=6)
+                ),
+                vol.Required(CONF_CACHE_TTL, default=current_ttl): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=8760)
+                ),
+                vol.Required(CONF_MOVEMENT_THRESHOLD, default=current_threshold): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=100000)
+                ),
+                vol.Required(CONF_AUTO_UPDATE, default=current_auto_update): bool,
+                vol.Required(CONF_MIN_INTERVAL, default=current_interval): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=86400)
+                ),
+                vol.Required(CONF_TIMEZONE_HOLD, default=current_hold): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=1440)
+                ),
+                vol.Optional(CONF_FAILOVER_PROVIDERS, default=current_failover): cv.multi_select(
+                    failover_options
+                ),
+                vol.Required(CONF_HEDGE_PERCENTILE, default=current_hedge): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=99)
+                ),
+                vol.Optional(CONF_TRACKERS, default=current_trackers): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="device_tracker", multiple=True)
+                ),
+                vol.Required(CONF_DEBUG_SENSORS, default=current_debug_sensors): bool,
             }),
             errors=self._errors,
             description_placeholders={}
@@ -114,22 +224,83 @@ class GeoLocatorOptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
             CONF_API_KEY,
             self.config_entry.data.get(CONF_API_KEY, "")
         )
+        current_url = self.config_entry.options.get(
+            CONF_BASE_URL,
+            self.config_entry.data.get(CONF_BASE_URL, "")
+        )
 
-        if not provider_meta.get("needs_key"):
-            return self.async_create_entry(
-                title="",
-                data={CONF_API_PROVIDER: provider, CONF_API_KEY: ""}
+        if provider_meta.get("needs_url"):
+            if user_input is not None:
+                if error := _url_error(user_input.get(CONF_BASE_URL, "")):
+                    self._errors[CONF_BASE_URL] = error
+                else:
+                    self._settings.update({
+                        CONF_API_PROVIDER: provider,
+                        CONF_API_KEY: "",
+                        CONF_BASE_URL: user_input[CONF_BASE_URL],
+                    })
+                    return await self.async_step_failover_credentials()
+
+            return self.async_show_form(
+                step_id="options_credentials",
+                data_schema=vol.Schema({vol.Required(CONF_BASE_URL, default=current_url): str}),
+                errors=self._errors,
+                description_placeholders={}
             )
 
+        if not provider_meta.get("needs_key"):
+            self._settings.update({CONF_API_PROVIDER: provider, CONF_API_KEY: ""})
+            return await self.async_step_failover_credentials()
+
         if user_input is not None:
+            self._settings.update({
+                CONF_API_PROVIDER: provider,
+                CONF_API_KEY: user_input.get(CONF_API_KEY, ""),
+            })
+            return await self.async_step_failover_credentials()
+
+        return self.async_show_form(
+            step_id="options_credentials",
+            data_schema=vol.Schema({vol.Required(CONF_API_KEY, default=current_key): str}),
+            errors=self._errors,
+            description_placeholders={}
+        )
+
+    async def async_step_failover_credentials(self, user_input=None):
+        self._errors = {}
+
+        failover = self._settings.get(CONF_FAILOVER_PROVIDERS, [])
+        needs_key = [p for p in failover if API_PROVIDER_META.get(p, {}).get("needs_key")]
+        needs_url = [p for p in failover if API_PROVIDER_META.get(p, {}).get("needs_url")]
+        current_keys = self.config_entry.options.get(CONF_FAILOVER_API_KEYS, {})
+        current_urls = self.config_entry.options.get(CONF_FAILOVER_BASE_URLS, {})
+
+        if not needs_key and not needs_url:
             return self.async_create_entry(
                 title="",
-                data={CONF_API_PROVIDER: provider, CONF_API_KEY: user_input.get(CONF_API_KEY, "")}
+                data={**self._settings, CONF_FAILOVER_API_KEYS: {}, CONF_FAILOVER_BASE_URLS: {}}
             )
 
+        if user_input is not None:
+            for p in needs_url:
+                if error := _url_error(user_input.get(p, "")):
+                    self._errors[p] = error
+            if not self._errors:
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **self._settings,
+                        CONF_FAILOVER_API_KEYS: {p: user_input.get(p, "") for p in needs_key},
+                        CONF_FAILOVER_BASE_URLS: {p: user_input.get(p, "") for p in needs_url},
+                    }
+                )
+
         return self.async_show_form(
-            step_id="options_credentials",
-            data_schema=vol.Schema({vol.Required(CONF_API_KEY, default=current_key): str}),
+            step_id="failover_credentials",
+            data_schema=vol.Schema({
+                **{vol.Required(p, default=current_keys.get(p, "")): str for p in needs_key},
+                **{vol.Required(p, default=current_urls.get(p, "")): str for p in needs_url},
+            }),
             errors=self._errors,
             description_placeholders={}
         )
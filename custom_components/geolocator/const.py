@@ -4,22 +4,72 @@ DOMAIN = "geolocator"
 
 CONF_API_PROVIDER = "api_provider"
 CONF_API_KEY = "api_key"
+CONF_BASE_URL = "base_url"
+CONF_TIMEZONE_MODE = "timezone_mode"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_CACHE_PRECISION = "cache_precision"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_MOVEMENT_THRESHOLD = "movement_threshold"
+CONF_AUTO_UPDATE = "auto_update"
+CONF_MIN_INTERVAL = "min_update_interval"
+CONF_TIMEZONE_HOLD = "timezone_hold"
+CONF_FAILOVER_PROVIDERS = "failover_providers"
+CONF_FAILOVER_API_KEYS = "failover_api_keys"
+CONF_FAILOVER_BASE_URLS = "failover_base_urls"
+CONF_HEDGE_PERCENTILE = "hedge_percentile"
+CONF_TRACKERS = "device_trackers"
+CONF_DEBUG_SENSORS = "debug_sensors"
 
 SERVICE_UPDATE_LOCATION = "update_location"
 SERVICE_SET_TIMEZONE = "set_home_timezone"
+SERVICE_BUILD_GAZETTEER = "build_gazetteer"
+SERVICE_RESOLVE_LOCATIONS = "resolve_locations"
 
 
 ATTR_LATITUDE = "latitude"
 ATTR_LONGITUDE = "longitude"
 ATTR_TIMESTAMP = "timestamp"
 
+DEFAULT_REQUEST_TIMEOUT = 10  # seconds
+
+DEFAULT_CACHE_PRECISION = 3  # decimal places, roughly 110 m
+DEFAULT_CACHE_TTL = 168  # hours
+DEFAULT_MOVEMENT_THRESHOLD = 250  # metres
+DEFAULT_AUTO_UPDATE = True
+DEFAULT_MIN_INTERVAL = 60  # seconds
+DEFAULT_TIMEZONE_HOLD = 10  # minutes
+TIMEZONE_HYSTERESIS_DISTANCE = 2000  # metres
+DEFAULT_HEDGE_PERCENTILE = 0  # disabled
+DEFAULT_DEBUG_SENSORS = False
+
+DATA_TIMEZONE_ENGINE = f"{DOMAIN}_timezone_engine"
+DATA_GEOCODE_CACHE = f"{DOMAIN}_geocode_cache"
+DATA_TIMEZONE_NAMES = f"{DOMAIN}_timezone_names"
+DATA_GAZETTEER = f"{DOMAIN}_gazetteer"
+
+TIMEZONE_MODE_IN_MEMORY = "in_memory"
+TIMEZONE_MODE_MMAP = "mmap"
+DEFAULT_TIMEZONE_MODE = TIMEZONE_MODE_IN_MEMORY
+
+TIMEZONE_MODES = {
+    TIMEZONE_MODE_IN_MEMORY: "In memory (fastest lookups)",
+    TIMEZONE_MODE_MMAP: "Memory mapped (lowest RAM)",
+}
+
 TIMEZONE_SENSOR = "current_timezone"
 LOCATION_SENSOR = "current_location"
 
+# rate_limit: sustained requests per second allowed by the provider's free tier
+# rate_burst: requests allowed back to back, at least the requests of one update (default: one second's worth)
+# api: module in api/ and class implementing the provider, imported on first use
+# needs_url: self-hosted server, configured with its base URL
 API_PROVIDER_META = {
-    "google": {"name": "Google Maps", "needs_key": True},
-    "opencage": {"name": "OpenCage", "needs_key": True},
-    "geonames": {"name": "GeoNames", "needs_key": True},
-    "bigdatacloud": {"name": "BigDataCloud", "needs_key": False},
+    "google": {"name": "Google Maps", "needs_key": True, "rate_limit": 50, "api": "google.GoogleMapsAPI"},
+    "opencage": {"name": "OpenCage", "needs_key": True, "rate_limit": 1, "api": "opencage.OpenCageAPI"},
+    "geonames": {"name": "GeoNames", "needs_key": True, "rate_limit": 0.25, "rate_burst": 3, "api": "geonames.GeoNamesAPI"},
+    "bigdatacloud": {"name": "BigDataCloud", "needs_key": False, "rate_limit": 2, "api": "bigdatacloud.BigDataCloudAPI"},
+    "osm": {"name": "OpenStreetMap", "needs_key": False, "rate_limit": 1, "api": "osm.OSMAPI"},
+    "nominatim": {"name": "Nominatim (self-hosted)", "needs_key": False, "needs_url": True, "api": "osm.SelfHostedNominatimAPI"},
+    "photon": {"name": "Photon (self-hosted)", "needs_key": False, "needs_url": True, "api": "photon.PhotonAPI"},
     "offline": {"name": "Offline", "needs_key": False},
-}
\ No newline at end of file
+}
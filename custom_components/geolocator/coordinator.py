@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import time
+from dataclasses import replace
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.util import dt as dt_util
+
+from .const import API_PROVIDER_META, ATTR_LATITUDE, ATTR_LONGITUDE, DOMAIN, SERVICE_SET_TIMEZONE
+from .failover import ProviderChain
+from .gazetteer import Gazetteer
+from .metrics import (
+    STAGE_FALLBACK,
+    STAGE_FANOUT,
+    STAGE_GEOCODE,
+    STAGE_NAMES,
+    STAGE_SET_TIMEZONE,
+    STAGE_TIMEZONE,
+    STAGE_TOTAL,
+    UpdateMetrics,
+    span,
+)
+from .models import LocationSnapshot
+from .movement import MOVEMENT_WITHIN_TIMEZONE, MovementGate, TimezoneHysteresis
+from .names import TimezoneNameTable
+from .snapshots import HOME_KEY, SnapshotStore
+from .timezone import TimezoneEngine, next_offset_change
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GeoLocatorCoordinator:
+    """Resolves one location of a config entry and fans the result out to its sensors.
+
+    Without a tracker the location is the home coordinates, and only that
+    coordinator sets the system timezone. With one it is the position of a
+    device_tracker entity. Every coordinator shares the entry's provider chain
+    and the integration-wide cache, timezone engine and gazetteer.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        provider: str,
+        chain: ProviderChain | None,
+        tz_engine: TimezoneEngine,
+        tz_names: TimezoneNameTable,
+        gazetteer: Gazetteer,
+        gate: MovementGate,
+        hysteresis: TimezoneHysteresis,
+        tracker_entity_id: str | None = None,
+        snapshot_store: SnapshotStore | None = None,
+    ):
+        self.hass = hass
+        self.entry = entry
+        self.provider = provider
+        self.chain = chain
+        self.tz_engine = tz_engine
+        self.tz_names = tz_names
+        self.gazetteer = gazetteer
+        self.gate = gate
+        self.hysteresis = hysteresis
+        self.tracker_entity_id = tracker_entity_id
+        # Coordinators of the entry's device trackers, kept on the home coordinator
+        self.trackers: dict[str, GeoLocatorCoordinator] = {}
+        self.snapshot_store = snapshot_store
+        # Values from before the restart until the first refresh replaces them
+        restored = snapshot_store.get(self.snapshot_key) if snapshot_store else None
+        self.snapshot = restored or LocationSnapshot()
+        self.metrics = UpdateMetrics()
+        self._entities = []
+        self._offset_change_unsub = None
+        self._update_lock = asyncio.Lock()
+
+    @property
+    def is_home(self) -> bool:
+        return self.tracker_entity_id is None
+
+    @property
+    def snapshot_key(self) -> str:
+        return HOME_KEY if self.is_home else self.tracker_entity_id
+
+    @property
+    def name(self) -> str:
+        if self.is_home:
+            return "Home"
+        state = self.hass.states.get(self.tracker_entity_id)
+        return state.name if state else self.tracker_entity_id.split(".", 1)[-1]
+
+    def _position(self):
+        if self.is_home:
+            return self.hass.config.latitude, self.hass.config.longitude
+        state = self.hass.states.get(self.tracker_entity_id)
+        if state is None:
+            return None
+        lat = state.attributes.get(ATTR_LATITUDE)
+        lon = state.attributes.get(ATTR_LONGITUDE)
+        if lat is None or lon is None:
+            return None
+        return lat, lon
+
+    @callback
+    def async_add_entity(self, entity) -> CALLBACK_TYPE:
+        """Register a sensor for snapshot updates. Returns a callback that removes it."""
+        self._entities.append(entity)
+
+        @callback
+        def _remove():
+            self._entities.remove(entity)
+
+        return _remove
+
+    @callback
+    def async_publish(self, snapshot: LocationSnapshot) -> None:
+        """Publish a snapshot to every sensor in one pass; only changed sensors write state."""
+        self.snapshot = snapshot
+        if self.snapshot_store is not None:
+            self.snapshot_store.async_set(self.snapshot_key, snapshot)
+        for entity in self._entities:
+            entity.async_handle_snapshot(snapshot)
+
+    @callback
+    def async_shutdown(self) -> None:
+        self._async_cancel_offset_change()
+
+    async def _async_timezone_names_now(self, timezone_id, locale):
+        """Current abbreviation and localized full name of a zone."""
+        dt = datetime.now(ZoneInfo(timezone_id))
+        is_dst = dt.dst() is not None and dt.dst().total_seconds() != 0
+        zone_variant = 'daylight' if is_dst else 'standard'
+        return dt.tzname(), await self.tz_names.async_get(timezone_id, locale, zone_variant)
+
+    @callback
+    def _async_cancel_offset_change(self):
+        if self._offset_change_unsub is not None:
+            self._offset_change_unsub()
+            self._offset_change_unsub = None
+
+    @callback
+    def _async_schedule_offset_change(self, timezone_id, locale):
+        """Refresh the abbreviation and full name when DST starts or ends."""
+        self._async_cancel_offset_change()
+        if not timezone_id:
+            return
+        when = next_offset_change(ZoneInfo(timezone_id), dt_util.utcnow())
+        if when is None:
+            return
+
+        async def _async_offset_changed(now):
+            self._offset_change_unsub = None
+            snapshot = self.snapshot
+            if snapshot.timezone_id != timezone_id:
+                return
+            try:
+                abbreviation, full_name = await self._async_timezone_names_now(timezone_id, locale)
+            except Exception as e:
+                _LOGGER.warning("GeoLocator: Failed to refresh timezone name: %s", e)
+            else:
+                self.async_publish(
+                    replace(snapshot, timezone_abbreviation=abbreviation, timezone_full=full_name)
+                )
+            self._async_schedule_offset_change(timezone_id, locale)
+
+        self._offset_change_unsub = async_track_point_in_utc_time(
+            self.hass, _async_offset_changed, when
+        )
+
+    async def _async_prewarm_neighbour_names(self, lat, lon, locale):
+        # Resolve names for nearby zones ahead of time so a boundary crossing skips Babel
+        zones = await self.hass.async_add_executor_job(self.tz_engine.zones_near, lat, lon)
+        await self.tz_names.async_prewarm(zones, locale)
+
+    async def async_query_providers(self, lat: float, lon: float, language: str,
+                                    metrics: UpdateMetrics | None = None):
+        """Location, timezone and source name from the provider chain.
+
+        With metrics, each request's time is recorded as its own stage.
+        """
+        chain = self.chain
+        location = None
+        timezone_id = None
+        source = None
+
+        async def _async_timed(stage, coro):
+            with span(metrics, stage):
+                return await coro
+
+        # Both requests run concurrently; a failure in one keeps the other's result
+        geocode_result, timezone_result = await asyncio.gather(
+            _async_timed(STAGE_GEOCODE, chain.async_reverse_geocode(lat, lon, language)),
+            _async_timed(STAGE_TIMEZONE, chain.async_get_timezone(lat, lon, language)),
+            return_exceptions=True,
+        )
+
+        if isinstance(timezone_result, Exception):
+            _LOGGER.warning("GeoLocator: Failed to fetch timezone: %s", timezone_result)
+        else:
+            timezone_api, timezone_id = timezone_result
+            if timezone_api is not None:
+                source = API_PROVIDER_META[timezone_api.provider]["name"]
+
+        if isinstance(geocode_result, Exception):
+            _LOGGER.warning("GeoLocator: Failed to update location: %s", geocode_result)
+        elif geocode_result[0] is None:
+            _LOGGER.warning("GeoLocator: No provider returned an address")
+        else:
+            api, location = geocode_result
+            source = API_PROVIDER_META[api.provider]["name"]
+
+        return location, timezone_id, source
+
+    async def async_update_location(self, force: bool = False) -> None:
+        # Service calls and automatic updates never run concurrently
+        async with self._update_lock:
+            await self._async_update_location(force)
+
+    async def _async_update_location(self, force: bool) -> None:
+        hass = self.hass
+        position = self._position()
+        if position is None:
+            _LOGGER.debug("GeoLocator: %s has no coordinates, skipping", self.tracker_entity_id)
+            return
+        lat, lon = position
+
+        if not force and not self.gate.should_update(lat, lon):
+            _LOGGER.debug(
+                "GeoLocator: Moved less than %s m since the last update, skipping", self.gate.threshold
+            )
+            return
+
+        _LOGGER.debug("GeoLocator: Fetching location of %s for lat=%s, lon=%s", self.name, lat, lon)
+
+        start = time.perf_counter()
+        try:
+            location = None
+            timezone_id = None
+            source = None
+            olc = await async_import_module(hass, "openlocationcode.openlocationcode")
+            plus_code = olc.encode(lat, lon)
+
+            if self.chain is not None:
+                location, timezone_id, source = await self.async_query_providers(
+                    lat, lon, hass.config.language or "en", self.metrics
+                )
+
+            if location is None or not timezone_id:
+                with self.metrics.span(STAGE_FALLBACK):
+                    if location is None:
+                        # No provider, or none reachable: nearest place from the local index, if built
+                        try:
+                            location = await self.gazetteer.async_nearest(lat, lon)
+                        except Exception as e:
+                            _LOGGER.warning("GeoLocator: Failed to find nearest local place: %s", e)
+
+                    if not timezone_id:
+                        try:
+                            tz = await self.tz_engine.async_timezone_at(lat, lon, self.tracker_entity_id)
+                            if tz:
+                                timezone_id = tz
+                                source = "Local Fallback"
+                            else:
+                                source = "Error"
+                        except Exception as e:
+                            _LOGGER.warning("GeoLocator: Failed to find local timezone: %s", e)
+
+            # Parked on a timezone line: hold the current zone instead of flapping back
+            current_zone = hass.config.time_zone if self.is_home else self.snapshot.timezone_id
+            if (
+                timezone_id
+                and timezone_id != current_zone
+                and not force
+                and not self.hysteresis.allows(current_zone, timezone_id, lat, lon)
+            ):
+                _LOGGER.debug(
+                    "GeoLocator: Holding timezone %s instead of switching back to %s", current_zone, timezone_id
+                )
+                timezone_id = current_zone
+
+            movement = None
+            if location is not None or timezone_id:
+                movement = self.gate.record(lat, lon, timezone_id)
+            else:
+                # Nothing resolved: keep the previous anchor so the next trigger retries instead of being gated
+                _LOGGER.debug("GeoLocator: Nothing resolved for %s, not recording the point", self.name)
+            user_locale = hass.config.language or "en-US"
+
+            abbreviation = full_name = None
+            try:
+                if timezone_id:
+                    with self.metrics.span(STAGE_NAMES):
+                        abbreviation, full_name = await self._async_timezone_names_now(timezone_id, user_locale)
+
+                    if movement != MOVEMENT_WITHIN_TIMEZONE and self.tz_engine.loaded:
+                        hass.async_create_background_task(
+                            self._async_prewarm_neighbour_names(lat, lon, user_locale),
+                            "geolocator_prewarm_timezone_names",
+                        )
+            except Exception as e:
+                _LOGGER.warning("GeoLocator: Failed to get full timezone name: %s", e)
+
+            if timezone_id and timezone_id != current_zone:
+                if not self.is_home:
+                    self.hysteresis.record_switch(current_zone, lat, lon)
+                else:
+                    # Only the home location sets the system timezone, and only when it actually differs
+                    try:
+                        with self.metrics.span(STAGE_SET_TIMEZONE):
+                            await hass.services.async_call(
+                                DOMAIN,
+                                SERVICE_SET_TIMEZONE,
+                                {"timezone": timezone_id},
+                                blocking=True
+                            )
+                        self.hysteresis.record_switch(current_zone, lat, lon)
+                    except Exception as e:
+                        _LOGGER.error("GeoLocator: Failed to call set_home_timezone: %s", e)
+
+            snapshot = LocationSnapshot(
+                current_address=location.address if location else None,
+                city=location.city if location else None,
+                state=location.state if location else None,
+                country=location.country if location else None,
+                plus_code=plus_code,
+                timezone_id=timezone_id,
+                timezone_full=full_name,
+                timezone_abbreviation=abbreviation,
+                timezone_source=source,
+            )
+            with self.metrics.span(STAGE_FANOUT):
+                self.async_publish(snapshot)
+            self._async_schedule_offset_change(timezone_id, user_locale)
+
+        except Exception as e:
+            _LOGGER.exception("GeoLocator: Unexpected error during location update: %s", e)
+        finally:
+            self.metrics.record(STAGE_TOTAL, time.perf_counter() - start)
+            self.metrics.async_update_finished()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api.base import RATE_LIMITS
+from .failover import PROVIDER_HEALTH
+from .const import CONF_API_KEY, CONF_FAILOVER_API_KEYS, DATA_GAZETTEER, DATA_GEOCODE_CACHE, DATA_TIMEZONE_ENGINE, DATA_TIMEZONE_NAMES, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_FAILOVER_API_KEYS}
+
+
+def _ratio(hits: int, lookups: int):
+    return round(hits / lookups, 3) if lookups else None
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    engine = hass.data.get(DATA_TIMEZONE_ENGINE)
+    cache = hass.data.get(DATA_GEOCODE_CACHE)
+    names = hass.data.get(DATA_TIMEZONE_NAMES)
+    gazetteer = hass.data.get(DATA_GAZETTEER)
+
+    return {
+        "config": async_redact_data(dict(entry.options or entry.data), TO_REDACT),
+        "timezone_engine": engine.diagnostics() if engine else None,
+        "geocode_cache": cache.diagnostics() if cache else None,
+        "timezone_names": names.diagnostics() if names else None,
+        "gazetteer": gazetteer.diagnostics() if gazetteer else None,
+        "cache_hit_ratios": {
+            "geocode": _ratio(cache.hits, cache.hits + cache.misses) if cache else None,
+            "timezone_names": _ratio(names.hits, names.hits + names.misses) if names else None,
+            "timezone_fast_path": _ratio(engine.fast_path_hits, engine.lookups) if engine else None,
+        },
+        "update_timing": coordinator.metrics.diagnostics() if coordinator else None,
+        "movement": coordinator.gate.diagnostics() if coordinator else None,
+        "timezone_hysteresis": coordinator.hysteresis.diagnostics() if coordinator else None,
+        "trackers": {
+            entity_id: {
+                "movement": tracker.gate.diagnostics(),
+                "timezone": tracker.snapshot.timezone_id,
+                "update_timing": tracker.metrics.diagnostics(),
+            }
+            for entity_id, tracker in coordinator.trackers.items()
+        } if coordinator else None,
+        "rate_limits": {provider: bucket.diagnostics() for provider, bucket in RATE_LIMITS.items()},
+        "failover_chain": coordinator.chain.provider_names if coordinator and coordinator.chain else None,
+        "providers": {provider: health.diagnostics() for provider, health in PROVIDER_HEALTH.items()},
+    }
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from .const import API_PROVIDER_META
+
+_LOGGER = logging.getLogger(__name__)
+
+ROLLING_WINDOW = 50  # samples kept per provider
+MIN_SAMPLES = 3
+
+# A provider is degraded, and moved behind healthy ones, past either limit
+DEGRADED_ERROR_RATE = 0.2
+DEGRADED_LATENCY = 5.0  # seconds, p95
+
+BREAKER_FAILURES = 3
+BREAKER_RESET = 300  # seconds
+
+# Hedge deadline used until a provider has enough latency samples
+HEDGE_DEFAULT_DELAY = 3.0  # seconds
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+def percentile(samples, q: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Stop calling a provider after repeated failures, retrying once after a cool-off."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET):
+        self.failure_threshold = failures
+        self.reset_seconds = reset_seconds
+        self.state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == BREAKER_OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = BREAKER_HALF_OPEN
+        return self.state != BREAKER_OPEN
+
+    def record_success(self) -> None:
+        self.state = BREAKER_CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == BREAKER_HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = BREAKER_OPEN
+            self._opened_at = time.monotonic()
+
+
+class ProviderHealth:
+    """Rolling latency and error rate of one provider, plus its circuit breaker."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.latencies = deque(maxlen=ROLLING_WINDOW)
+        self.outcomes = deque(maxlen=ROLLING_WINDOW)
+        self.breaker = CircuitBreaker()
+        # HTTP requests sent, and ones that raised before a response was parsed
+        self.requests = 0
+        self.request_errors = 0
+        # Hedged races this provider answered first, and ones it lost or failed
+        self.hedge_wins = 0
+        self.hedge_losses = 0
+
+    def record_latency(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def record_result(self, ok: bool) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            self.breaker.record_success()
+        else:
+            was_open = self.breaker.state == BREAKER_OPEN
+            self.breaker.record_failure()
+            if not was_open and self.breaker.state == BREAKER_OPEN:
+                _LOGGER.warning("GeoLocator: %s failed repeatedly, pausing requests to it", self.provider)
+
+    def latency_percentile(self, q: float):
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        return percentile(self.latencies, q)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def degraded(self) -> bool:
+        p95 = self.latency_percentile(95)
+        return self.error_rate > DEGRADED_ERROR_RATE or (p95 is not None and p95 > DEGRADED_LATENCY)
+
+    @property
+    def score(self) -> float:
+        """Lower is better: p95 latency inflated by the error rate."""
+        p95 = self.latency_percentile(95) or DEGRADED_LATENCY
+        return p95 * (1 + 4 * self.error_rate)
+
+    def diagnostics(self) -> dict:
+        return {
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "p50": self.latency_percentile(50),
+            "p95": self.latency_percentile(95),
+            "error_rate": round(self.error_rate, 3),
+            "degraded": self.degraded,
+            "breaker": self.breaker.state,
+            "hedge_wins": self.hedge_wins,
+            "hedge_losses": self.hedge_losses,
+        }
+
+
+# Shared by every config entry so all of them learn from each other's requests
+PROVIDER_HEALTH: dict[str, ProviderHealth] = {}
+
+
+def provider_health(provider: str) -> ProviderHealth:
+    if provider not in PROVIDER_HEALTH:
+        PROVIDER_HEALTH[provider] = ProviderHealth(provider)
+    return PROVIDER_HEALTH[provider]
+
+
+class ProviderChain:
+    """Ordered failover across providers.
+
+    Healthy providers are tried in the configured order; degraded ones follow,
+    fastest first, and providers with an open circuit breaker are skipped.
+
+    With hedging enabled, a provider that hasn't answered by its own latency
+    percentile gets raced against the next one; the first valid answer wins and
+    the other request is cancelled.
+    """
+
+    def __init__(self, apis: list, hedge_percentile: float | None = None):
+        self.apis = apis
+        self.hedge_percentile = hedge_percentile
+
+    def ordered(self) -> list:
+        def sort_key(item):
+            index, api = item
+            health = provider_health(api.provider)
+            if health.degraded:
+                return (1, health.score, index)
+            return (0, 0, index)
+
+        return [
+            api for _, api in sorted(enumerate(self.apis), key=sort_key)
+            if provider_health(api.provider).breaker.allow()
+        ]
+
+    def _hedge_deadline(self, api):
+        if not self.hedge_percentile:
+            return None
+        deadline = provider_health(api.provider).latency_percentile(self.hedge_percentile)
+        return HEDGE_DEFAULT_DELAY if deadline is None else deadline
+
+    async def _async_call(self, api, method: str, is_valid, args):
+        """Call one provider and record the outcome. Returns (ok, result or error).
+
+        Only exceptions, including error payloads, count against the provider;
+        an empty answer, e.g. no address at sea, is a healthy response that
+        just moves on to the next provider.
+        """
+        health = provider_health(api.provider)
+        try:
+            result = await getattr(api, method)(*args)
+        except Exception as e:
+            _LOGGER.debug("GeoLocator: %s %s failed: %s", api.provider, method, e)
+            health.record_result(False)
+            return False, e
+        health.record_result(True)
+        return is_valid(api, result), result
+
+    async def _async_first_valid(self, apis: list, method: str, is_valid, *args):
+        last_error = None
+        pending = list(apis)
+        while pending:
+            api = pending.pop(0)
+            racing = {asyncio.ensure_future(self._async_call(api, method, is_valid, args)): api}
+            try:
+                deadline = self._hedge_deadline(api) if pending else None
+                if deadline is not None:
+                    done, _ = await asyncio.wait(racing, timeout=deadline)
+                    if not done:
+                        secondary = pending.pop(0)
+                        _LOGGER.debug(
+                            "GeoLocator: %s slower than %.2fs, hedging with %s",
+                            api.provider, deadline, secondary.provider,
+                        )
+                        racing[asyncio.ensure_future(self._async_call(secondary, method, is_valid, args))] = secondary
+                race = list(racing.values())
+
+                while racing:
+                    done, _ = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        finished_api = racing.pop(task)
+                        ok, value = task.result()
+                        if ok:
+                            if len(race) > 1:
+                                for raced in race:
+                                    health = provider_health(raced.provider)
+                                    if raced is finished_api:
+                                        health.hedge_wins += 1
+                                    else:
+                                        health.hedge_losses += 1
+                            return finished_api, value
+                        if isinstance(value, Exception):
+                            last_error = value
+                if len(race) > 1:
+                    for raced in race:
+                        provider_health(raced.provider).hedge_losses += 1
+            finally:
+                for task in racing:
+                    task.cancel()
+        if last_error is not None:
+            raise last_error
+        return None, None
+
+    async def async_reverse_geocode(self, latitude: float, longitude: float, language: str):
+        """Return (api, Location) from the first provider with a usable answer."""
+        return await self._async_first_valid(
+            self.ordered(), "reverse_geocode", lambda api, location: location is not None,
+            latitude, longitude, language,
+        )
+
+    async def async_get_timezone(self, latitude: float, longitude: float, language: str):
+        """Return (api, IANA zone) from the first provider that knows the zone."""
+        return await self._async_first_valid(
+            [api for api in self.ordered() if api.provides_timezone], "get_timezone", lambda api, tz: bool(tz),
+            latitude, longitude, language,
+        )
+
+    @property
+    def provider_names(self) -> list:
+        return [API_PROVIDER_META.get(api.provider, {}).get("name", api.provider) for api in self.apis]
@@ -0,0 +1,293 @@
+import asyncio
+import io
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+import zipfile
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_GAZETTEER, DOMAIN
+from .models import Location
+from .movement import haversine
+
+_LOGGER = logging.getLogger(__name__)
+
+GEONAMES_DUMP_URL = "https://download.geonames.org/export/dump"
+GAZETTEER_DATASETS = ("cities500", "cities1000", "cities5000", "cities15000")
+DEFAULT_GAZETTEER_DATASET = "cities1000"
+DOWNLOAD_TIMEOUT = 300  # seconds
+
+# Nearest place must be this close to count as the city, or to supply state and country
+CITY_RADIUS = 25000  # metres
+REGION_RADIUS = 250000  # metres
+SEARCH_RADII = (50000, REGION_RADIUS)
+
+# File layout, little endian:
+#   header, cell offsets (one per 1x1 degree cell, plus an end marker),
+#   place records sorted by cell, string offsets, UTF-8 string blob
+MAGIC = b"GLGZ"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIII")  # magic, version, places, strings, blob bytes
+PLACE = struct.Struct("<iiIII")  # lat e6, lon e6, name, admin1, country (string indexes)
+U32 = struct.Struct("<I")
+NO_STRING = 0xFFFFFFFF
+GRID_COLUMNS = 360
+GRID_ROWS = 180
+GRID_CELLS = GRID_COLUMNS * GRID_ROWS
+METRES_PER_DEGREE = 111320
+
+
+def _cell_index(row: int, col: int) -> int:
+    return row * GRID_COLUMNS + col
+
+
+def _cell_of(lat: float, lon: float) -> tuple[int, int]:
+    row = min(max(int(math.floor(lat + 90)), 0), GRID_ROWS - 1)
+    col = int(math.floor(lon + 180)) % GRID_COLUMNS
+    return row, col
+
+
+def build_index(cities_zip: bytes, admin1_text: str, country_text: str, dataset: str) -> bytes:
+    """Build the binary index from GeoNames dump files."""
+    countries = {}
+    for line in country_text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) > 4:
+            countries[fields[0]] = fields[4]
+
+    admin1 = {}
+    for line in admin1_text.splitlines():
+        fields = line.split("\t")
+        if len(fields) > 1:
+            admin1[fields[0]] = fields[1]
+
+    strings = {}
+
+    def intern(value):
+        if not value:
+            return NO_STRING
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    places = []
+    with zipfile.ZipFile(io.BytesIO(cities_zip)) as archive:
+        with archive.open(f"{dataset}.txt") as cities:
+            for raw in io.TextIOWrapper(cities, encoding="utf-8"):
+                fields = raw.rstrip("\n").split("\t")
+                if len(fields) < 11:
+                    continue
+                lat, lon = float(fields[4]), float(fields[5])
+                country_code = fields[8]
+                row, col = _cell_of(lat, lon)
+                places.append((
+                    _cell_index(row, col),
+                    round(lat * 1e6),
+                    round(lon * 1e6),
+                    intern(fields[1]),
+                    intern(admin1.get(f"{country_code}.{fields[10]}")),
+                    intern(countries.get(country_code)),
+                ))
+    places.sort()
+
+    out = io.BytesIO()
+    blob = b"".join(value.encode("utf-8") for value in strings)
+    out.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(places), len(strings), len(blob)))
+
+    cell_offsets = [0] * (GRID_CELLS + 1)
+    for cell, *_ in places:
+        cell_offsets[cell + 1] += 1
+    for cell in range(GRID_CELLS):
+        cell_offsets[cell + 1] += cell_offsets[cell]
+    out.write(struct.pack(f"<{GRID_CELLS + 1}I", *cell_offsets))
+
+    for _, *record in places:
+        out.write(PLACE.pack(*record))
+
+    offset = 0
+    for value in strings:
+        out.write(U32.pack(offset))
+        offset += len(value.encode("utf-8"))
+    out.write(U32.pack(offset))
+    out.write(blob)
+    return out.getvalue()
+
+
+class _Index:
+    """One mapped index file.
+
+    Never modified once mapped: a rebuild maps a new file and swaps the
+    reference, and the old map is unmapped once the last lookup holding it
+    lets go, so lookups running during a rebuild never see it closed.
+    """
+
+    def __init__(self, index_map: mmap.mmap, places: int, strings: int):
+        self.map = index_map
+        self.places = places
+        self.cells_at = HEADER.size
+        self.places_at = self.cells_at + (GRID_CELLS + 1) * U32.size
+        self.strings_at = self.places_at + places * PLACE.size
+        self.blob_at = self.strings_at + (strings + 1) * U32.size
+
+    def string(self, index: int):
+        if index == NO_STRING:
+            return None
+        start, end = struct.unpack_from("<2I", self.map, self.strings_at + index * U32.size)
+        return self.map[self.blob_at + start:self.blob_at + end].decode("utf-8")
+
+    def scan_cell(self, row: int, col: int, lat: float, lon: float, best):
+        start, end = struct.unpack_from("<2I", self.map, self.cells_at + _cell_index(row, col) * U32.size)
+        for i in range(start, end):
+            record = PLACE.unpack_from(self.map, self.places_at + i * PLACE.size)
+            distance = haversine(lat, lon, record[0] / 1e6, record[1] / 1e6)
+            if best is None or distance < best[0]:
+                best = (distance, record)
+        return best
+
+
+class Gazetteer:
+    """Offline nearest-place lookup over a memory-mapped GeoNames index.
+
+    The index is built on demand by the build_gazetteer service and shared by
+    every GeoLocator config entry.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str):
+        self.hass = hass
+        self.path = path
+        self._index: _Index | None = None
+        self._load_lock = asyncio.Lock()
+        self.lookups = 0
+        self.build_seconds = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def _open(self):
+        """Map the index file, or None if there is none. Must run in the executor."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as file:
+            index_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, places, strings, _ = HEADER.unpack_from(index_map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            _LOGGER.warning("GeoLocator: Ignoring gazetteer index with unknown format, rebuild it")
+            index_map.close()
+            return None
+        _LOGGER.debug("GeoLocator: Loaded gazetteer with %d places", places)
+        return _Index(index_map, places, strings)
+
+    def _load(self):
+        self._index = self._open()
+
+    async def async_load(self) -> bool:
+        """Load the index if needed. Returns False when no index has been built."""
+        if self._index is not None:
+            return True
+        async with self._load_lock:
+            if self._index is None:
+                await self.hass.async_add_executor_job(self._load)
+        return self._index is not None
+
+    def nearest(self, lat: float, lon: float):
+        """Location of the nearest populated place, or None past REGION_RADIUS. Must run in the executor."""
+        index = self._index
+        if index is None:
+            return None
+        self.lookups += 1
+        best = None
+        # Scan every cell that can hold a point within the radius; widen only if nothing was found
+        for radius in SEARCH_RADII:
+            lat_span = radius / METRES_PER_DEGREE
+            edge_lat = min(abs(lat) + lat_span, 89.9)
+            lon_span = min(lat_span / math.cos(math.radians(edge_lat)), 180)
+            row_lo, col_lo = _cell_of(max(lat - lat_span, -90), lon - lon_span)
+            row_hi, col_hi = _cell_of(min(lat + lat_span, 89.999), lon + lon_span)
+            columns = GRID_COLUMNS if lon_span >= 180 else (col_hi - col_lo) % GRID_COLUMNS + 1
+            for row in range(row_lo, row_hi + 1):
+                for c in range(columns):
+                    best = index.scan_cell(row, (col_lo + c) % GRID_COLUMNS, lat, lon, best)
+            if best is not None and best[0] <= radius:
+                break
+
+        if best is None or best[0] > REGION_RADIUS:
+            return None
+        distance, (_, _, name, admin1, country) = best
+        return Location(
+            city=index.string(name) if distance <= CITY_RADIUS else None,
+            state=index.string(admin1),
+            country=index.string(country),
+        )
+
+    def nearest_many(self, points: list) -> list:
+        """nearest() for many (lat, lon) points in one executor job."""
+        return [self.nearest(lat, lon) for lat, lon in points]
+
+    async def async_nearest(self, lat: float, lon: float):
+        if not await self.async_load():
+            return None
+        return await self.hass.async_add_executor_job(self.nearest, lat, lon)
+
+    def _write(self, data: bytes):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _build(self, cities_zip, admin1_text, country_text, dataset):
+        data = build_index(cities_zip, admin1_text, country_text, dataset)
+        # The new file replaces the old one's directory entry; the old map stays valid for lookups still using it
+        self._write(data)
+        self._load()
+
+    async def async_build(self, session: aiohttp.ClientSession, dataset: str = DEFAULT_GAZETTEER_DATASET):
+        """Download the GeoNames dumps and rebuild the index."""
+        start = time.perf_counter()
+        timeout = aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+
+        async def _download(name):
+            async with session.get(f"{GEONAMES_DUMP_URL}/{name}", timeout=timeout) as resp:
+                resp.raise_for_status()
+                return await resp.read()
+
+        cities_zip, admin1, countries = await asyncio.gather(
+            _download(f"{dataset}.zip"),
+            _download("admin1CodesASCII.txt"),
+            _download("countryInfo.txt"),
+        )
+        async with self._load_lock:
+            await self.hass.async_add_executor_job(
+                self._build, cities_zip, admin1.decode("utf-8"), countries.decode("utf-8"), dataset
+            )
+        self.build_seconds = time.perf_counter() - start
+        _LOGGER.info(
+            "GeoLocator: Built gazetteer from %s with %d places in %.1fs",
+            dataset, self._index.places if self._index else 0, self.build_seconds,
+        )
+
+    def diagnostics(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "places": self._index.places if self._index else None,
+            "lookups": self.lookups,
+            "build_seconds": self.build_seconds,
+        }
+
+
+def async_get_gazetteer(hass: HomeAssistant) -> Gazetteer:
+    """Return the shared gazetteer, creating it on first use."""
+    gazetteer = hass.data.get(DATA_GAZETTEER)
+    if gazetteer is None:
+        gazetteer = Gazetteer(hass, hass.config.path(DOMAIN, "gazetteer.bin"))
+        hass.data[DATA_GAZETTEER] = gazetteer
+    return gazetteer
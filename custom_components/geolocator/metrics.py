@@ -0,0 +1,111 @@
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .failover import percentile
+
+STAGE_GEOCODE = "geocode"
+STAGE_TIMEZONE = "timezone"
+STAGE_FALLBACK = "fallback"
+STAGE_NAMES = "names"
+STAGE_SET_TIMEZONE = "set_timezone"
+STAGE_FANOUT = "fanout"
+STAGE_TOTAL = "total"
+STAGES = (
+    STAGE_GEOCODE,
+    STAGE_TIMEZONE,
+    STAGE_FALLBACK,
+    STAGE_NAMES,
+    STAGE_SET_TIMEZONE,
+    STAGE_FANOUT,
+    STAGE_TOTAL,
+)
+
+HISTOGRAM_WINDOW = 200  # samples kept per stage
+# Upper bounds of the histogram buckets in milliseconds; slower samples land in a final open bucket
+HISTOGRAM_BUCKETS = (1, 5, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class RollingHistogram:
+    """Durations of the most recent samples of one stage, in milliseconds."""
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.last = None
+
+    def record(self, milliseconds: float) -> None:
+        self.samples.append(milliseconds)
+        self.count += 1
+        self.last = milliseconds
+
+    def buckets(self) -> dict:
+        counts = dict.fromkeys([f"<={bound}" for bound in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}"], 0)
+        for sample in self.samples:
+            for bound in HISTOGRAM_BUCKETS:
+                if sample <= bound:
+                    counts[f"<={bound}"] += 1
+                    break
+            else:
+                counts[f">{HISTOGRAM_BUCKETS[-1]}"] += 1
+        return counts
+
+    def diagnostics(self) -> dict:
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": percentile(self.samples, 50),
+            "p95": percentile(self.samples, 95),
+            "max": max(self.samples, default=None),
+            "buckets": self.buckets(),
+        }
+
+
+class UpdateMetrics:
+    """Per-stage timing of one coordinator's location updates.
+
+    Provider stages run concurrently, so stage times don't add up to the total.
+    Stages an update skips, e.g. the fallback when a provider answered, record
+    nothing for that update.
+    """
+
+    def __init__(self):
+        self.stages = {stage: RollingHistogram() for stage in STAGES}
+        self._listeners = []
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage].record(seconds * 1000)
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    @callback
+    def async_add_listener(self, listener) -> CALLBACK_TYPE:
+        """Call listener after every finished update. Returns a callback that removes it."""
+        self._listeners.append(listener)
+
+        @callback
+        def _remove():
+            self._listeners.remove(listener)
+
+        return _remove
+
+    @callback
+    def async_update_finished(self) -> None:
+        for listener in self._listeners:
+            listener()
+
+    def diagnostics(self) -> dict:
+        return {stage: histogram.diagnostics() for stage, histogram in self.stages.items()}
+
+
+def span(metrics: UpdateMetrics | None, stage: str):
+    """metrics.span(stage), or a no-op for callers that aren't timed."""
+    return metrics.span(stage) if metrics is not None else nullcontext()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class LocationSnapshot:
+    """Sensor values published by one location update.
+
+    Field names match the sensor keys in sensor.py.
+    """
+
+    current_address: str | None = None
+    city: str | None = None
+    state: str | None = None
+    country: str | None = None
+    plus_code: str | None = None
+    timezone_id: str | None = None
+    timezone_full: str | None = None
+    timezone_abbreviation: str | None = None
+    timezone_source: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Location:
+    """A reverse geocoding result, normalized from any provider.
+
+    Providers parse their response into one of these in a single pass and drop
+    the raw payload; the geocode cache stores the same record.
+    """
+
+    address: str | None = None
+    neighborhood: str | None = None
+    city: str | None = None
+    state: str | None = None
+    country: str | None = None
+    timezone: str | None = None
+    # 0-1 where the provider reports how precise the match is
+    confidence: float | None = None
@@ -0,0 +1,100 @@
+import time
+from math import asin, cos, radians, sin, sqrt
+
+EARTH_RADIUS_M = 6371008.8
+
+MOVEMENT_FIRST = "first"
+MOVEMENT_STATIONARY = "stationary"
+MOVEMENT_WITHIN_TIMEZONE = "within_timezone"
+MOVEMENT_CROSSED_TIMEZONE = "crossed_timezone"
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * asin(min(1.0, sqrt(a)))
+
+
+class MovementGate:
+    """Skip location updates until the position has moved far enough."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.last_point = None
+        self.last_timezone = None
+        self.last_movement = None
+        self.skipped = 0
+
+    def distance_from_last(self, lat: float, lon: float):
+        if self.last_point is None:
+            return None
+        return haversine(self.last_point[0], self.last_point[1], lat, lon)
+
+    def should_update(self, lat: float, lon: float) -> bool:
+        distance = self.distance_from_last(lat, lon)
+        if distance is not None and distance < self.threshold:
+            self.skipped += 1
+            self.last_movement = MOVEMENT_STATIONARY
+            return False
+        return True
+
+    def record(self, lat: float, lon: float, timezone_id) -> str:
+        """Remember a resolved point and classify how it relates to the previous one."""
+        if self.last_point is None:
+            movement = MOVEMENT_FIRST
+        elif timezone_id and timezone_id == self.last_timezone:
+            movement = MOVEMENT_WITHIN_TIMEZONE
+        else:
+            movement = MOVEMENT_CROSSED_TIMEZONE
+
+        self.last_point = (lat, lon)
+        if timezone_id:
+            self.last_timezone = timezone_id
+        self.last_movement = movement
+        return movement
+
+    def diagnostics(self) -> dict:
+        return {
+            "threshold_m": self.threshold,
+            "last_movement": self.last_movement,
+            "skipped_updates": self.skipped,
+        }
+
+
+class TimezoneHysteresis:
+    """Stop the system timezone flapping while parked on a timezone line.
+
+    Switching back to the zone we just left is held off until the vehicle has
+    moved away from the switch point or the hold time has passed.
+    """
+
+    def __init__(self, hold_seconds: float, distance: float):
+        self.hold_seconds = hold_seconds
+        self.distance = distance
+        self._last_switch = None  # (monotonic time, lat, lon, previous zone)
+        self.suppressed = 0
+
+    def allows(self, current_zone, new_zone, lat: float, lon: float) -> bool:
+        if self._last_switch is None or not current_zone:
+            return True
+        switched_at, switch_lat, switch_lon, previous_zone = self._last_switch
+        if new_zone != previous_zone:
+            return True
+        if time.monotonic() - switched_at >= self.hold_seconds:
+            return True
+        if haversine(switch_lat, switch_lon, lat, lon) >= self.distance:
+            return True
+        self.suppressed += 1
+        return False
+
+    def record_switch(self, previous_zone, lat: float, lon: float) -> None:
+        self._last_switch = (time.monotonic(), lat, lon, previous_zone)
+
+    def diagnostics(self) -> dict:
+        return {
+            "hold_seconds": self.hold_seconds,
+            "distance_m": self.distance,
+            "suppressed_switches": self.suppressed,
+        }
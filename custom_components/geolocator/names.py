@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from importlib.metadata import version
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_TIMEZONE_NAMES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.timezone_names"
+STORAGE_VERSION = 1
+SAVE_DELAY = 60  # seconds
+
+ZONE_VARIANTS = ("standard", "daylight")
+
+
+def _key(timezone_id: str, locale: str, variant: str) -> str:
+    return f"{timezone_id}|{locale}|{variant}"
+
+
+def _compute_names(timezone_ids, locale: str) -> dict:
+    """Resolve localized names for every variant of the given zones with Babel. Must run in the executor."""
+    from babel.core import Locale, UnknownLocaleError
+    from babel.dates import get_timezone, get_timezone_name
+
+    try:
+        loc = Locale.parse(locale, sep='-')
+    except (UnknownLocaleError, ValueError):
+        loc = Locale.parse("en-US", sep='-')
+
+    names = {}
+    for timezone_id in timezone_ids:
+        try:
+            tzinfo = get_timezone(timezone_id)
+        except LookupError:
+            _LOGGER.debug("GeoLocator: Babel does not know timezone %s", timezone_id)
+            continue
+        for variant in ZONE_VARIANTS:
+            names[_key(timezone_id, locale, variant)] = get_timezone_name(
+                tzinfo, width="long", zone_variant=variant, locale=loc
+            )
+    return names
+
+
+class TimezoneNameTable:
+    """Memoized localized timezone names, keyed on (zone, locale, DST variant).
+
+    Names are resolved with Babel in the executor the first time a zone is seen
+    and persisted, so later updates and restarts never touch CLDR data.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._names: dict[str, str] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        self._babel_version = None
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            # CLDR names can change between Babel releases; read the version without importing Babel
+            self._babel_version = await self.hass.async_add_executor_job(version, "Babel")
+            if data.get("babel") == self._babel_version:
+                self._names = data.get("names", {})
+            self._loaded = True
+
+    @callback
+    def get(self, timezone_id: str, locale: str, variant: str):
+        return self._names.get(_key(timezone_id, locale, variant))
+
+    async def async_get(self, timezone_id: str, locale: str, variant: str):
+        name = self.get(timezone_id, locale, variant)
+        if name is not None:
+            self.hits += 1
+            return name
+        self.misses += 1
+        await self.async_prewarm([timezone_id], locale)
+        return self.get(timezone_id, locale, variant)
+
+    async def async_prewarm(self, timezone_ids, locale: str):
+        """Resolve names for zones not in the table yet, in a single executor job."""
+        missing = [
+            tz for tz in set(timezone_ids)
+            if tz and any(_key(tz, locale, v) not in self._names for v in ZONE_VARIANTS)
+        ]
+        if not missing:
+            return
+        names = await self.hass.async_add_executor_job(_compute_names, missing, locale)
+        self._names.update(names)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {"babel": self._babel_version, "names": self._names}
+
+    def diagnostics(self) -> dict:
+        return {
+            "entries": len(self._names),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def async_get_timezone_names(hass: HomeAssistant) -> TimezoneNameTable:
+    """Return the shared timezone name table, restoring it from storage on first use."""
+    table = hass.data.get(DATA_TIMEZONE_NAMES)
+    if table is None:
+        table = TimezoneNameTable(hass)
+        hass.data[DATA_TIMEZONE_NAMES] = table
+    await table.async_load()
+    return table
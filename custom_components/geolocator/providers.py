@@ -0,0 +1,35 @@
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.importlib import async_import_module
+
+from .const import API_PROVIDER_META
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_create_api(
+    hass: HomeAssistant, provider: str, session, api_key: str, timeout, base_url: str | None = None
+):
+    """Create the API client of a provider, or None for offline.
+
+    Provider modules are imported in the executor the first time a config
+    entry uses them, so unused providers are never loaded.
+    """
+    meta = API_PROVIDER_META.get(provider)
+    if meta is None:
+        raise ValueError(f"Unsupported API provider: {provider}")
+    if "api" not in meta:
+        return None
+
+    module_name, class_name = meta["api"].rsplit(".", 1)
+    module = await async_import_module(hass, f"{__package__}.api.{module_name}")
+    api_class = getattr(module, class_name)
+    _LOGGER.debug("GeoLocator: Loaded %s provider", meta["name"])
+    if meta.get("needs_url"):
+        if not base_url:
+            raise ValueError(f"{meta['name']} needs the base URL of its server")
+        return api_class(session, base_url, timeout=timeout)
+    if meta["needs_key"]:
+        return api_class(session, api_key, timeout=timeout)
+    return api_class(session, timeout=timeout)
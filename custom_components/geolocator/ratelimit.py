@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.throttled = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def async_acquire(self):
+        """Wait until a token is available and take it. Waiters are served in order."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                self.throttled += 1
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+            self._tokens -= 1
+
+    def diagnostics(self) -> dict:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "throttled": self.throttled,
+        }
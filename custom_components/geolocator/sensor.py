@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from zoneinfo import ZoneInfo
-from datetime import datetime
 
-from .const import DOMAIN
+from .const import CONF_DEBUG_SENSORS, DEFAULT_DEBUG_SENSORS, DOMAIN
+from .metrics import (
+    STAGE_FALLBACK,
+    STAGE_FANOUT,
+    STAGE_GEOCODE,
+    STAGE_NAMES,
+    STAGE_SET_TIMEZONE,
+    STAGE_TIMEZONE,
+    STAGE_TOTAL,
+)
+from .models import LocationSnapshot
 
 SENSOR_KEYS = {
     "current_address": "Current Address",
@@ -33,75 +42,112 @@ SENSOR_ICONS = {
     "plus_code": "mdi:crosshairs-gps",
 }
 
+TIMING_SENSOR_NAMES = {
+    STAGE_TOTAL: "Update Duration",
+    STAGE_GEOCODE: "Geocode Duration",
+    STAGE_TIMEZONE: "Timezone Request Duration",
+    STAGE_FALLBACK: "Local Fallback Duration",
+    STAGE_NAMES: "Timezone Name Duration",
+    STAGE_SET_TIMEZONE: "Set Timezone Duration",
+    STAGE_FANOUT: "Sensor Update Duration",
+}
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    api_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN][entry.entry_id]
     sensors = []
 
     provider = entry.options.get("api_provider") or entry.data.get("api_provider", "google")
 
-    for key, name in SENSOR_KEYS.items():
-        if provider == "offline" and key not in ("timezone_id", "timezone_abbreviation", "timezone_source"):
-            continue
-        if key == "timezone_source":
-            sensors.append(TimezoneSourceSensor(hass=hass, entry=entry))
-        else:
-            sensors.append(GeoLocatorSensor(hass=hass, entry=entry, key=key, name=name, api_data=api_data))
+    # One sensor set for the home location and one per device tracker
+    for location in (coordinator, *coordinator.trackers.values()):
+        for key, name in SENSOR_KEYS.items():
+            # City, state and country come from the local gazetteer once it has been built
+            if provider == "offline" and key not in (
+                "city", "state", "country", "timezone_id", "timezone_abbreviation", "timezone_source"
+            ):
+                continue
+            if key == "timezone_source":
+                sensors.append(TimezoneSourceSensor(entry=entry, coordinator=location))
+            else:
+                sensors.append(GeoLocatorSensor(entry=entry, coordinator=location, key=key, name=name))
+
+    # Timing of the home location's updates; trackers' timings are in the diagnostics download
+    if (entry.options or entry.data).get(CONF_DEBUG_SENSORS, DEFAULT_DEBUG_SENSORS):
+        sensors.extend(UpdateTimingSensor(entry, coordinator, stage) for stage in TIMING_SENSOR_NAMES)
 
     async_add_entities(sensors)
 
 
 class GeoLocatorSensor(SensorEntity):
-    def __init__(self, hass, entry, key, name, api_data):
+    _attr_should_poll = False
+
+    def __init__(self, entry, coordinator, key, name):
         self._entry = entry
+        self._coordinator = coordinator
         self._key = key
         self._name = name
-        self._api_data = api_data
-        self._attr_name = f"GeoLocator: {name}"
-        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        if coordinator.is_home:
+            self._unique_prefix = entry.entry_id
+            self._attr_name = f"GeoLocator: {name}"
+        else:
+            self._unique_prefix = f"{entry.entry_id}_{coordinator.tracker_entity_id}"
+            self._attr_name = f"GeoLocator {coordinator.name}: {name}"
+        self._attr_unique_id = f"{self._unique_prefix}_{key}"
         self._attr_icon = SENSOR_ICONS.get(key, "mdi:map-marker-question")
+        self._attr_native_value = getattr(coordinator.snapshot, key)
 
-
+    async def async_added_to_hass(self) -> None:
         # Register self for updates
-        hass.data[DOMAIN][entry.entry_id]["entities"].append(self)
+        self.async_on_remove(self._coordinator.async_add_entity(self))
+        self.async_handle_snapshot(self._coordinator.snapshot)
+
+    @callback
+    def async_handle_snapshot(self, snapshot: LocationSnapshot) -> None:
+        """Take this sensor's value from a new snapshot, writing state only if it changed."""
+        value = getattr(snapshot, self._key)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+class TimezoneSourceSensor(GeoLocatorSensor):
+    def __init__(self, entry, coordinator):
+        super().__init__(
+            entry=entry,
+            coordinator=coordinator,
+            key="timezone_source",
+            name=SENSOR_KEYS["timezone_source"],
+        )
+        self._attr_unique_id = f"{self._unique_prefix}_data_source"
+        self._attr_icon = SENSOR_ICONS.get("timezone_source", "mdi:cloud-question")
 
-    @property
-    def state(self):
-        if self._key in ("timezone_id", "timezone_abbreviation"):
-            tz_id = self._api_data.get("last_timezone")
-            if not tz_id:
-                return None
-            try:
-                now = datetime.now(ZoneInfo(tz_id))
-                if self._key == "timezone_id":
-                    return tz_id
-                elif self._key == "timezone_abbreviation":
-                    return now.tzname()
-            except Exception:
-                return None
-        elif self._key == "timezone_full":
-            return self._api_data.get("timezone_full")
-        elif self._key == "plus_code":
-            return self._api_data.get("last_plus_code")
-        else:
-            last = self._api_data.get("last_address")
-            if not last:
-                return None
-            return last.get(self._key)
 
+class UpdateTimingSensor(SensorEntity):
+    """Duration of one stage of the last update, with its rolling percentiles as attributes."""
 
-class TimezoneSourceSensor(SensorEntity):
-    def __init__(self, hass, entry):
-        self._hass = hass
-        self._entry = entry
-        self._attr_name = "GeoLocator: Data Source"
-        self._attr_unique_id = f"{entry.entry_id}_data_source"
-        self._attr_icon = SENSOR_ICONS.get("timezone_source", "mdi:cloud-question")
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 1
+    _attr_icon = "mdi:timer-outline"
 
+    def __init__(self, entry, coordinator, stage):
+        self._coordinator = coordinator
+        self._histogram = coordinator.metrics.stages[stage]
+        self._attr_name = f"GeoLocator: {TIMING_SENSOR_NAMES[stage]}"
+        self._attr_unique_id = f"{entry.entry_id}_timing_{stage}"
 
-        hass.data[DOMAIN][entry.entry_id]["entities"].append(self)
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._coordinator.metrics.async_add_listener(self.async_write_ha_state))
 
     @property
-    def state(self):
-        return self._hass.data[DOMAIN][self._entry.entry_id].get("last_timezone_source")
+    def native_value(self):
+        return self._histogram.last
 
-    
+    @property
+    def extra_state_attributes(self) -> dict:
+        diagnostics = self._histogram.diagnostics()
+        return {key: diagnostics[key] for key in ("count", "p50", "p95", "max")}
@@ -0,0 +1,59 @@
+import logging
+from dataclasses import asdict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import LocationSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # seconds
+HOME_KEY = "home"
+
+
+class SnapshotStore:
+    """Last published snapshot of each location of a config entry, persisted across restarts.
+
+    Restored snapshots give sensors their previous values at startup, before
+    the first refresh has reached any provider.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshots")
+        self._snapshots: dict[str, LocationSnapshot] = {}
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        for key, values in data.items():
+            try:
+                self._snapshots[key] = LocationSnapshot(**values)
+            except TypeError:
+                _LOGGER.debug("GeoLocator: Dropping stored snapshot of %s with unknown fields", key)
+
+    @callback
+    def get(self, key: str):
+        return self._snapshots.get(key)
+
+    @callback
+    def async_set(self, key: str, snapshot: LocationSnapshot) -> None:
+        self._snapshots[key] = snapshot
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_retain(self, keys) -> None:
+        """Forget snapshots of locations no longer configured, e.g. removed trackers."""
+        dropped = set(self._snapshots) - set(keys)
+        for key in dropped:
+            del self._snapshots[key]
+        if dropped:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return {key: asdict(snapshot) for key, snapshot in self._snapshots.items()}
+
+    async def async_remove(self):
+        await self._store.async_remove()
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import math
+import mmap
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_TIMEZONE_ENGINE, DOMAIN, TIMEZONE_MODE_IN_MEMORY, TIMEZONE_MODE_MMAP
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rings sampled around a point to discover neighbouring zones
+NEIGHBOUR_RINGS_KM = (75, 250)
+NEIGHBOUR_BEARINGS = 8
+
+
+def _resident_bytes():
+    """Return the resident set size of this process, or None if unknown."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def next_offset_change(zone: ZoneInfo, start: datetime, horizon_days: int = 400):
+    """Return the first instant after start (UTC) where the zone's UTC offset changes, or None."""
+    lo = start
+    offset = lo.astimezone(zone).utcoffset()
+    for _ in range(horizon_days):
+        hi = lo + timedelta(days=1)
+        if hi.astimezone(zone).utcoffset() != offset:
+            # Bisect down to the second the new offset takes effect
+            while hi - lo > timedelta(seconds=1):
+                mid = lo + (hi - lo) / 2
+                if mid.astimezone(zone).utcoffset() == offset:
+                    lo = mid
+                else:
+                    hi = mid
+            return hi.replace(microsecond=0)
+        lo = hi
+    return None
+
+
+def _distance_to_ring(coords, x: int, y: int) -> float:
+    """Planar distance from a point to the nearest edge of a polygon ring, in coordinate units."""
+    import numpy as np
+
+    x1 = coords[0].astype(np.float64)
+    y1 = coords[1].astype(np.float64)
+    dx = np.roll(x1, -1) - x1
+    dy = np.roll(y1, -1) - y1
+    length2 = dx * dx + dy * dy
+    t = np.clip(((x - x1) * dx + (y - y1) * dy) / np.where(length2 == 0, 1, length2), 0, 1)
+    return float(np.sqrt(np.min((x1 + t * dx - x) ** 2 + (y1 + t * dy - y) ** 2)))
+
+
+class _ContainingPolygon:
+    """The polygon that held the last resolved point.
+
+    Points within the safe radius of the anchor cannot have crossed an edge, so
+    they are answered without any polygon test; other points inside the
+    bounding box get one exact test against this polygon alone.
+    """
+
+    def __init__(self, zone: str, coords, holes: list, x: int, y: int):
+        self.zone = zone
+        self.coords = coords
+        self.holes = holes
+        self.bbox = (int(coords[0].min()), int(coords[0].max()), int(coords[1].min()), int(coords[1].max()))
+        self._anchor(x, y)
+
+    def _anchor(self, x: int, y: int):
+        self.anchor = (x, y)
+        safe_radius = min(_distance_to_ring(ring, x, y) for ring in (self.coords, *self.holes))
+        self.safe_radius2 = int(safe_radius) ** 2
+
+    def contains(self, x: int, y: int) -> bool:
+        from timezonefinder.helpers import inside_polygon
+
+        dx = x - self.anchor[0]
+        dy = y - self.anchor[1]
+        if dx * dx + dy * dy < self.safe_radius2:
+            return True
+        xmin, xmax, ymin, ymax = self.bbox
+        if not (xmin <= x <= xmax and ymin <= y <= ymax):
+            return False
+        if not inside_polygon(x, y, self.coords) or any(inside_polygon(x, y, hole) for hole in self.holes):
+            return False
+        self._anchor(x, y)
+        return True
+
+
+class _MappedFile:
+    """Read-only memory map exposing the file API TimezoneFinder expects."""
+
+    def __init__(self, file):
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        file.close()
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        return self._map.seek(pos, whence)
+
+    def tell(self):
+        return self._map.tell()
+
+    def read(self, size=-1):
+        return self._map.read(size)
+
+    def getbuffer(self):
+        return memoryview(self._map)
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # numpy views into the map are still alive; the OS unmaps it once they go away
+            pass
+
+
+class TimezoneEngine:
+    """Offline timezone lookup shared by every GeoLocator config entry.
+
+    timezonefinder and its polygon dataset are imported and loaded once, lazily
+    and in the executor, the first time a lookup is needed.
+
+    TimezoneFinder reads its data with seek() then read() on shared file
+    objects, so lookups from concurrent executor jobs are serialized.
+    """
+
+    def __init__(self, hass: HomeAssistant, mode: str = TIMEZONE_MODE_IN_MEMORY):
+        self.hass = hass
+        self.mode = mode
+        self._finder = None
+        self._batch = None
+        self._finder_lock = threading.Lock()
+        self._load_lock = asyncio.Lock()
+        self.load_seconds = None
+        self.resident_bytes = None
+        self.lookups = 0
+        self.fast_path_hits = 0
+        # Last containing polygon per tracked location; None is the home location
+        self._last_polygons: dict[str | None, _ContainingPolygon] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._finder is not None
+
+    def _load(self):
+        start = time.perf_counter()
+        from timezonefinder import TimezoneFinder
+        from timezonefinder.timezonefinder import fromfile_memory
+
+        rss_before = _resident_bytes()
+
+        if self.mode == TIMEZONE_MODE_MMAP:
+            finder = TimezoneFinder(in_memory=False)
+            for attribute_name in finder.binary_data_attributes:
+                setattr(finder, attribute_name, _MappedFile(getattr(finder, attribute_name)))
+            finder._fromfile = fromfile_memory
+        else:
+            finder = TimezoneFinder(in_memory=True)
+
+        rss_after = _resident_bytes()
+        self.load_seconds = time.perf_counter() - start
+        if rss_before is not None and rss_after is not None:
+            self.resident_bytes = max(rss_after - rss_before, 0)
+        _LOGGER.debug(
+            "GeoLocator: Loaded TimezoneFinder (%s) in %.3fs", self.mode, self.load_seconds
+        )
+        return finder
+
+    async def async_load(self):
+        if self._finder is not None:
+            return
+        async with self._load_lock:
+            if self._finder is None:
+                self._finder = await self.hass.async_add_executor_job(self._load)
+
+    def _lookup(self, lat: float, lon: float):
+        try:
+            with self._finder_lock:
+                return self._finder.timezone_at(lat=lat, lng=lon)
+        except Exception as e:
+            _LOGGER.warning("GeoLocator: Exception while finding timezone: %s", e)
+            return None
+
+    def _containing_polygon(self, lat: float, lon: float, zone: str):
+        from timezonefinder.helpers import coord2int, coord2shortcut, inside_polygon
+
+        finder = self._finder
+        x, y = coord2int(lon), coord2int(lat)
+        with self._finder_lock:
+            for polygon_id in finder.polygon_ids_of_shortcut(*coord2shortcut(lon, lat)):
+                if finder.timezone_names[finder.id_of(polygon_id)] != zone:
+                    continue
+                coords = finder.coords_of(polygon_id)
+                if not inside_polygon(x, y, coords):
+                    continue
+                holes = list(finder._holes_of_poly(polygon_id))
+                if any(inside_polygon(x, y, hole) for hole in holes):
+                    continue
+                return _ContainingPolygon(zone, coords, holes, x, y)
+        return None
+
+    def timezone_at(self, lat: float, lon: float, key: str | None = None):
+        """Resolve the timezone of a tracked location. Must run in the executor.
+
+        The polygon containing the location's previous point is checked first,
+        so a stationary or slowly moving location skips the full search.
+        """
+        from timezonefinder.helpers import coord2int
+
+        self.lookups += 1
+        last_polygon = self._last_polygons.get(key)
+        if last_polygon is not None and last_polygon.contains(coord2int(lon), coord2int(lat)):
+            self.fast_path_hits += 1
+            return last_polygon.zone
+
+        zone = self._lookup(lat, lon)
+        try:
+            polygon = self._containing_polygon(lat, lon, zone) if zone else None
+        except Exception as e:
+            _LOGGER.debug("GeoLocator: Could not cache the containing polygon: %s", e)
+            polygon = None
+        if polygon is None:
+            self._last_polygons.pop(key, None)
+        else:
+            self._last_polygons[key] = polygon
+        return zone
+
+    def timezone_ids_at(self, lats, lons):
+        """Zone name per point of lat/lon arrays, None where there is none. Must run in the executor.
+
+        Answers match timezone_at point by point, but shortcut bucketing and
+        polygon tests run vectorized, so thousands of points cost little more
+        than a few.
+        """
+        self.lookups += len(lats)
+        with self._finder_lock:
+            if self._batch is None:
+                from .timezone_batch import BatchLookup
+
+                self._batch = BatchLookup(self._finder)
+            return self._batch.timezones_at(lats, lons)
+
+    def timezones_at(self, points: list) -> list:
+        """Resolve many (lat, lon) points in one executor job, without touching the polygon cache."""
+        if not points:
+            return []
+        lats, lons = zip(*points)
+        try:
+            return self.timezone_ids_at(lats, lons).tolist()
+        except Exception as e:
+            _LOGGER.warning("GeoLocator: Batch timezone lookup failed, resolving points one by one: %s", e)
+            return [self._lookup(lat, lon) for lat, lon in points]
+
+    def zones_near(self, lat: float, lon: float) -> set:
+        """Zones found on rings around a point. Must run in the executor."""
+        zones = set()
+        for radius_km in NEIGHBOUR_RINGS_KM:
+            for i in range(NEIGHBOUR_BEARINGS):
+                bearing = 2 * math.pi * i / NEIGHBOUR_BEARINGS
+                sample_lat = lat + radius_km / 111.32 * math.cos(bearing)
+                if not -90 < sample_lat < 90:
+                    continue
+                scale = max(math.cos(math.radians(sample_lat)), 0.01)
+                sample_lon = (lon + radius_km / (111.32 * scale) * math.sin(bearing) + 180) % 360 - 180
+                if zone := self._lookup(sample_lat, sample_lon):
+                    zones.add(zone)
+        return zones
+
+    async def async_timezone_at(self, lat: float, lon: float, key: str | None = None):
+        await self.async_load()
+        return await self.hass.async_add_executor_job(self.timezone_at, lat, lon, key)
+
+    def diagnostics(self) -> dict:
+        return {
+            "mode": self.mode,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "resident_bytes": self.resident_bytes,
+            "lookups": self.lookups,
+            "fast_path_hits": self.fast_path_hits,
+        }
+
+
+def async_get_timezone_engine(hass: HomeAssistant, mode: str = TIMEZONE_MODE_IN_MEMORY) -> TimezoneEngine:
+    """Return the shared timezone engine, creating it on first use.
+
+    There is only ever one engine: the mode is integration-wide, and the entry
+    set up last decides it. Switching modes moves every loaded coordinator onto
+    the new engine, so the old one and its polygon data are released.
+    """
+    engine = hass.data.get(DATA_TIMEZONE_ENGINE)
+    if engine is None or engine.mode != mode:
+        if engine is not None:
+            _LOGGER.info("GeoLocator: Switching timezone engine from '%s' to '%s'", engine.mode, mode)
+        engine = TimezoneEngine(hass, mode)
+        hass.data[DATA_TIMEZONE_ENGINE] = engine
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            for location in (coordinator, *coordinator.trackers.values()):
+                location.tz_engine = engine
+    return engine
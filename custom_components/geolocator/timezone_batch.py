@@ -0,0 +1,161 @@
+"""Vectorized timezone lookup for arrays of points.
+
+Gives the same answers as TimezoneFinder.timezone_at called point by point, on
+the same dataset: points are bucketed by shortcut (the dataset's half degree
+grid of candidate polygons), each shortcut's polygons are read once, and the
+bounding box and point-in-polygon tests run over all of a shortcut's points
+together. Imported on first use, in the executor.
+"""
+import numpy as np
+from timezonefinder.global_settings import (
+    COORD2INT_FACTOR,
+    DTYPE_FORMAT_H_NUMPY,
+    DTYPE_FORMAT_SIGNED_I_NUMPY,
+    INT2COORD_FACTOR,
+    NR_BYTES_I,
+    NR_LAT_SHORTCUTS,
+    POLY_MAX_VALUES,
+    SHORTCUTS_UNIQUE_ID,
+    TIMEZONE_NAMES,
+)
+
+# Upper bound on point x edge elements per vectorized ray casting step
+CHUNK_ELEMENTS = 1 << 20
+
+
+def inside_polygon(x, y, coordinates):
+    """Ray casting as timezonefinder.helpers.inside_polygon, for arrays of int coordinates."""
+    contained = np.zeros(len(x), dtype=bool)
+    if not len(x):
+        return contained
+
+    # Edge k runs from vertex k - 1 to vertex k, starting with the closing edge
+    x2 = coordinates[0].astype(np.int64)
+    y2 = coordinates[1].astype(np.int64)
+    x1 = np.roll(x2, 1)
+    y1 = np.roll(y2, 1)
+
+    # Only edges spanning a point's latitude can be crossed
+    spanning = (np.maximum(y1, y2) >= y.min()) & (np.minimum(y1, y2) < y.max())
+    x1, y1, x2, y2 = x1[spanning], y1[spanning], x2[spanning], y2[spanning]
+    if not len(x1):
+        return contained
+
+    step = max(1, CHUNK_ELEMENTS // len(x1))
+    for start in range(0, len(x), step):
+        px = x[start:start + step, None]
+        py = y[start:start + step, None]
+        above1 = py > y1
+        above2 = py > y2
+        upward = above1 & ~above2
+        downward = above2 & ~above1
+        right1 = px <= x1
+        right2 = px <= x2
+        # Slopes compared without division, in int64 like timezonefinder
+        lhs = (y2 - py) * (x2 - x1)
+        rhs = (y2 - y1) * (x2 - px)
+        slope = np.where(upward, lhs <= rhs, lhs >= rhs)
+        crossed = (upward | downward) & ((right1 & right2) | ((right1 | right2) & slope))
+        contained[start:start + step] = np.count_nonzero(crossed, axis=1) % 2 == 1
+    return contained
+
+
+class BatchLookup:
+    """Timezone lookup over arrays of points, on a loaded TimezoneFinder."""
+
+    def __init__(self, finder):
+        self._finder = finder
+        names = getattr(finder, TIMEZONE_NAMES)
+        self._no_zone = len(names)
+        # Zone index -> name; the extra last entry is "no zone"
+        self._names = np.array([*names, None], dtype=object)
+        unique_ids = getattr(finder, SHORTCUTS_UNIQUE_ID)
+        unique_ids.seek(0)
+        self._unique_ids = np.frombuffer(unique_ids.read(), dtype=DTYPE_FORMAT_H_NUMPY).astype(np.int64)
+
+    def zone_indices(self, lats, lons):
+        """Index into the dataset's zone names per point, or the number of zones where there is none."""
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        zones = np.full(len(lats), self._no_zone, dtype=np.int64)
+
+        # Out of range and NaN coordinates have no zone, as timezone_at rejects them
+        valid = (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+        lats = lats[valid]
+        lons = np.where(lons[valid] == 180, -180, lons[valid])
+        lats = np.where(lats == -90, lats + INT2COORD_FACTOR, lats)
+        shortcuts = (
+            np.floor(lons + 180).astype(np.int64) * NR_LAT_SHORTCUTS + np.floor((90 - lats) * 2).astype(np.int64)
+        )
+
+        found = self._unique_ids[shortcuts]
+        searched = found >= self._no_zone
+        if searched.any():
+            # Truncated toward zero like coord2int
+            x = (lons[searched] * COORD2INT_FACTOR).astype(np.int64)
+            y = (lats[searched] * COORD2INT_FACTOR).astype(np.int64)
+            unique_shortcuts, groups = np.unique(shortcuts[searched], return_inverse=True)
+            order = np.argsort(groups, kind="stable")
+            bounds = np.searchsorted(groups[order], np.arange(len(unique_shortcuts) + 1))
+            searched_zones = np.empty(len(x), dtype=np.int64)
+            polygons = {}
+            for shortcut, start, end in zip(unique_shortcuts, bounds[:-1], bounds[1:]):
+                members = order[start:end]
+                searched_zones[members] = self._search_shortcut(int(shortcut), x[members], y[members], polygons)
+            found[searched] = searched_zones
+
+        zones[valid] = found
+        return zones
+
+    def timezones_at(self, lats, lons):
+        """Zone name per point, None where there is none, in an object array shaped like lats."""
+        shape = np.shape(lats)
+        return self._names[self.zone_indices(lats, lons)].reshape(shape)
+
+    def _polygon(self, polygon_id: int, polygons: dict):
+        polygon = polygons.get(polygon_id)
+        if polygon is None:
+            finder = self._finder
+            max_values = getattr(finder, POLY_MAX_VALUES)
+            max_values.seek(4 * NR_BYTES_I * polygon_id)
+            bounds = finder._fromfile(max_values, dtype=DTYPE_FORMAT_SIGNED_I_NUMPY, count=4)
+            polygon = polygons[polygon_id] = (
+                tuple(int(bound) for bound in bounds),
+                finder.coords_of(polygon_nr=polygon_id),
+                list(finder._holes_of_poly(polygon_id)),
+            )
+        return polygon
+
+    def _search_shortcut(self, shortcut: int, x, y, polygons: dict):
+        """timezone_at's search of one shortcut's polygons, for all of its points at once."""
+        finder = self._finder
+        polygon_ids = finder.polygon_ids_of_shortcut(*divmod(shortcut, NR_LAT_SHORTCUTS))
+        if len(polygon_ids) == 0:
+            return self._no_zone
+        zone_ids = finder.id_list(polygon_ids, len(polygon_ids)).astype(np.int64)
+        if len(polygon_ids) == 1:
+            return zone_ids[0]
+
+        zones = np.full(len(x), self._no_zone, dtype=np.int64)
+        pending = np.arange(len(x))
+        for i, polygon_id in enumerate(polygon_ids):
+            if not len(pending):
+                break
+            # Only polygons of one zone remain: the rest of the points are in it
+            if (zone_ids[i:] == zone_ids[i]).all():
+                zones[pending] = zone_ids[i]
+                break
+
+            (xmax, xmin, ymax, ymin), coords, holes = self._polygon(int(polygon_id), polygons)
+            px, py = x[pending], y[pending]
+            candidates = np.flatnonzero((px <= xmax) & (px >= xmin) & (py <= ymax) & (py >= ymin))
+            if not len(candidates):
+                continue
+            inside = inside_polygon(px[candidates], py[candidates], coords)
+            for hole in holes:
+                in_hole = inside_polygon(px[candidates[inside]], py[candidates[inside]], hole)
+                inside[np.flatnonzero(inside)[in_hole]] = False
+            matched = candidates[inside]
+            zones[pending[matched]] = zone_ids[i]
+            pending = np.delete(pending, matched)
+        return zones